@@ -2,6 +2,7 @@
 ASGI config for it_helpdesk project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Run it with ``uvicorn it_helpdesk.asgi:application``; see the README.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +13,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'it_helpdesk.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'true')
+# Each async request runs its queries on a fresh thread, so connections kept
+# open between requests would pile up; use DB_POOL_MAX_SIZE instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,118 @@
+"""
+Asset assignment and status history, and point-in-time inventory.
+
+``AssetAssignment`` rows hold an asset's assignee and status over
+``[valid_from, valid_to)``. Saving an asset with a different assignee or
+status closes its open interval and opens a new one (``support.signals``),
+and imports and the load seeder write intervals in bulk.
+
+"State at ``at``" is one range condition per row, ``valid_from <= at <
+valid_to`` (or no ``valid_to``), so each question below is one query on
+the interval indexes instead of a replay of the history in Python.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Asset, AssetAssignment
+
+
+def end_of_day(day):
+    """The last instant of ``day``, for "the inventory on date D"."""
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min)) - timedelta(microseconds=1)
+
+
+def active_at(at) -> Q:
+    return Q(valid_from__lte=at) & (Q(valid_to__gt=at) | Q(valid_to=None))
+
+
+def overlapping(start, end) -> Q:
+    """Intervals that were current at some point of ``[start, end)``."""
+    return Q(valid_from__lt=end) & (Q(valid_to__gt=start) | Q(valid_to=None))
+
+
+def record_assignment(asset: Asset, previous, changed_by=None, at=None) -> AssetAssignment:
+    """
+    Start a new interval if ``asset`` changed from ``previous``.
+
+    ``previous`` is the stored ``(assigned_to_id, status)``, or None for a
+    new asset. Returns the new interval, or None if nothing changed.
+
+    The asset row is locked first, so concurrent edits of one asset take
+    turns closing the open interval instead of both inserting a new one.
+    """
+    if previous == (asset.assigned_to_id, asset.status):
+        return None
+    at = at or timezone.now()
+    with transaction.atomic():
+        if previous is not None:
+            Asset.objects.select_for_update().filter(pk=asset.pk).values_list("pk").first()
+            AssetAssignment.objects.filter(asset=asset, valid_to=None).update(valid_to=at)
+        return AssetAssignment.objects.create(
+            asset=asset, assigned_to_id=asset.assigned_to_id, status=asset.status,
+            changed_by=changed_by, valid_from=at,
+        )
+
+
+def opening_intervals(assets, changed_by=None, at=None) -> list:
+    """Unsaved current intervals for new ``assets``, for ``bulk_create``."""
+    at = at or timezone.now()
+    return [
+        AssetAssignment(
+            asset_id=asset.pk, assigned_to_id=asset.assigned_to_id, status=asset.status,
+            changed_by=changed_by, valid_from=at,
+        )
+        for asset in assets
+    ]
+
+
+def holder_at(serial_number: str, at):
+    """The interval of asset ``serial_number`` current at ``at``, with its assignee, or None."""
+    return (
+        AssetAssignment.objects.filter(active_at(at), asset__serial_number=serial_number)
+        .select_related("asset", "assigned_to")
+        .first()
+    )
+
+
+def inventory_at(at, device_type=None, status=None):
+    """Intervals current at ``at``: one per asset that existed then."""
+    intervals = AssetAssignment.objects.filter(active_at(at))
+    if device_type:
+        intervals = intervals.filter(asset__device_type=device_type)
+    if status:
+        intervals = intervals.filter(status=status)
+    return intervals
+
+
+def inventory_counts(at, device_type=None) -> list:
+    """``[{"device_type", "status", "count"}]`` of the fleet at ``at``."""
+    return list(
+        inventory_at(at, device_type)
+        .values("asset__device_type", "status")
+        .annotate(count=Count("id"))
+        .order_by("asset__device_type", "status")
+    )
+
+
+def assets_in_status(status: str, start, end, device_type=None) -> int:
+    """Assets that were in ``status`` at any time during ``[start, end)``."""
+    intervals = AssetAssignment.objects.filter(overlapping(start, end), status=status)
+    if device_type:
+        intervals = intervals.filter(asset__device_type=device_type)
+    return intervals.values("asset").distinct().count()
+
+
+def inventory_table(counts) -> list:
+    """``inventory_counts`` as one row per device type: ``{"device_type", "counts", "total"}``."""
+    statuses = [value for value, _label in Asset.STATUS_CHOICES]
+    rows = {}
+    for row in counts:
+        by_status = rows.setdefault(row["asset__device_type"], dict.fromkeys(statuses, 0))
+        by_status[row["status"]] = row["count"]
+    return [
+        {"device_type": device_type, "counts": list(by_status.values()), "total": sum(by_status.values())}
+        for device_type, by_status in rows.items()
+    ]
@@ -0,0 +1,224 @@
+"""
+Async versions of the read-heavy pages, served when running under ASGI.
+
+``support.urls`` routes the dashboards, the asset list and ticket detail
+here when ``settings.ASYNC_VIEWS`` is on, which ``it_helpdesk/asgi.py``
+turns on by default. Independent queries are started together with
+``asyncio.gather`` and every row a template needs is loaded before
+rendering, so templates never query from the event loop.
+
+Django's async ORM still executes each query through ``sync_to_async`` on
+the request's own worker thread, so one request's queries do not overlap
+yet; the event loop is free for other requests while they run, which is
+where the throughput under concurrent clients comes from.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .caching import ASSETS, TICKETS, acached
+from .db import reads_from_replica
+from .events import newest_events
+from .exports import export_querystring
+from .filters import admin_ticket_queryset, asset_queryset
+from .forms import TicketCommentForm
+from .models import Asset, Ticket
+from .pagination import ASSET_CURSOR_ORDERING, TICKET_CURSOR_ORDERING, apaginate
+from .search import search_tickets
+from .stats import asset_aggregates, aticket_stats, category_breakdown
+from .utils import is_it_admin
+from .warranty import with_warranty
+from .views import comments_shown, newest_comments, thread_context
+
+# Rendering touches the session, messages and the user, which are sync APIs.
+arender = sync_to_async(render)
+arender_to_string = sync_to_async(render_to_string)
+
+
+async def request_user(request):
+    """Resolve the user once, so templates rendered in a thread reuse it."""
+    request.user = await request.auser()
+    return request.user
+
+
+@login_required
+@reads_from_replica
+async def employee_dashboard(request):
+    """Employee dashboard with own tickets and assigned assets."""
+    user = await request_user(request)
+    tickets = Ticket.objects.filter(employee=user)
+    assets = Asset.objects.filter(assigned_to=user)
+    user_key = [user.pk]
+    search_query = request.GET.get("search", "")
+
+    async def employee_stats():
+        ticket_totals, total_assets = await asyncio.gather(
+            aticket_stats(employee=user), assets.acount()
+        )
+        return {
+            "total_tickets": ticket_totals["total"],
+            "open_tickets": ticket_totals["open"],
+            "in_progress": ticket_totals["in_progress"],
+            "resolved": ticket_totals["resolved"],
+            "closed": ticket_totals["closed"],
+            "high_urgency": ticket_totals["high_urgency"],
+            "total_assets": total_assets,
+        }
+
+    async def ticket_table():
+        listed = search_tickets(tickets, search_query) if search_query else tickets
+        page_obj = await apaginate(request, listed, "employee_dashboard", 10, TICKET_CURSOR_ORDERING)
+        return await arender_to_string("support/fragments/employee_ticket_table.html", {
+            "tickets": page_obj,
+            "search_query": search_query,
+        }, request)
+
+    async def asset_cards():
+        rows = [asset async for asset in assets]
+        return await arender_to_string(
+            "support/fragments/employee_assets.html", {"assets": rows}, request
+        )
+
+    stats, table, cards = await asyncio.gather(
+        acached("employee_stats", [TICKETS, ASSETS], user_key, employee_stats),
+        acached("employee_ticket_table", [TICKETS], user_key + [request.GET.urlencode()], ticket_table),
+        acached("employee_assets", [ASSETS], user_key, asset_cards),
+    )
+    return await arender(request, "support/employee_dashboard.html", {
+        "ticket_table": table,
+        "asset_cards": cards,
+        "stats": stats,
+        "search_query": search_query,
+    })
+
+
+@login_required
+async def ticket_detail(request, pk):
+    """Ticket detail view with comments."""
+    user = await request_user(request)
+    if request.method == "POST":
+        ticket = await aget_object_or_404(Ticket, pk=pk)
+        if not await sync_to_async(is_it_admin)(user) and ticket.employee_id != user.pk:
+            messages.error(request, "You don't have permission to view this ticket.")
+            return redirect("employee_dashboard")
+        comment_form = TicketCommentForm(request.POST)
+        if comment_form.is_valid():
+            comment = comment_form.save(commit=False)
+            comment.ticket = ticket
+            comment.user = user
+            await comment.asave()
+            messages.success(request, "Comment added successfully!")
+            return redirect("ticket_detail", pk=pk)
+    else:
+        comment_form = TicketCommentForm()
+
+    # The ticket and its timeline only depend on ``pk``, so load them together.
+    shown = comments_shown(request)
+    ticket, comments, events, admin = await asyncio.gather(
+        aget_object_or_404(Ticket.objects.select_related("employee", "assigned_to"), pk=pk),
+        _alist(newest_comments(pk, shown)),
+        _alist(newest_events(pk, shown + 1)),
+        sync_to_async(is_it_admin)(user),
+    )
+
+    # Security: employees can only view their own tickets
+    if not admin and ticket.employee_id != user.pk:
+        messages.error(request, "You don't have permission to view this ticket.")
+        return redirect("employee_dashboard")
+
+    return await arender(request, "support/ticket_detail.html", {
+        "ticket": ticket,
+        "comment_form": comment_form,
+        **await sync_to_async(thread_context)(comments, events, shown),
+    })
+
+
+@login_required
+@user_passes_test(is_it_admin)
+@reads_from_replica
+async def admin_dashboard(request):
+    """IT admin dashboard with ticket filters and statistics."""
+    user = await request_user(request)
+    status_filter = request.GET.get("status") or ""
+    category_filter = request.GET.get("category") or ""
+    urgency_filter = request.GET.get("urgency") or ""
+    search_query = request.GET.get("search") or ""
+
+    tickets = admin_ticket_queryset(request.GET)
+
+    async def ticket_table():
+        page_obj = await apaginate(request, tickets, "admin_dashboard", 15, TICKET_CURSOR_ORDERING)
+        return await arender_to_string("support/fragments/admin_ticket_table.html", {
+            "tickets": page_obj,
+            "status_filter": status_filter,
+            "category_filter": category_filter,
+            "urgency_filter": urgency_filter,
+            "search_query": search_query,
+        }, request)
+
+    # Statistics (with the category breakdown and recent count) and the page
+    stats, table = await asyncio.gather(
+        acached("admin_stats", [TICKETS], [], aticket_stats),
+        acached("admin_ticket_table", [TICKETS], [user.pk, request.GET.urlencode()], ticket_table),
+    )
+    return await arender(request, "support/admin_dashboard.html", {
+        "ticket_table": table,
+        "status_filter": status_filter,
+        "category_filter": category_filter,
+        "urgency_filter": urgency_filter,
+        "search_query": search_query,
+        "status_choices": Ticket.STATUS_CHOICES,
+        "category_choices": Ticket.CATEGORY_CHOICES,
+        "urgency_choices": Ticket.URGENCY_CHOICES,
+        "stats": stats,
+        "category_stats": category_breakdown(stats),
+        "recent_tickets": stats["recent"],
+        "export_query": export_querystring(request.GET),
+    })
+
+
+@login_required
+@user_passes_test(is_it_admin)
+@reads_from_replica
+async def asset_list(request):
+    """List all assets for IT admin."""
+    user = await request_user(request)
+    status_filter = request.GET.get("status") or ""
+    search_query = request.GET.get("search") or ""
+
+    today = timezone.localdate()
+    assets = with_warranty(asset_queryset(request.GET), today)
+
+    async def asset_stats():
+        total, counts = await asyncio.gather(
+            assets.acount(), Asset.objects.aaggregate(**asset_aggregates(today))
+        )
+        return {"total": total, **counts}
+
+    async def asset_table():
+        page_obj = await apaginate(request, assets, "asset_list", 15, ASSET_CURSOR_ORDERING)
+        return await arender_to_string("support/fragments/asset_table.html", {
+            "assets": page_obj,
+            "status_filter": status_filter,
+            "search_query": search_query,
+        }, request)
+
+    stats, table = await asyncio.gather(
+        acached("asset_stats", [ASSETS], [today, status_filter, search_query], asset_stats),
+        acached("asset_table", [ASSETS], [user.pk, today, request.GET.urlencode()], asset_table),
+    )
+    return await arender(request, "support/asset_list.html", {
+        "asset_table": table,
+        "stats": stats,
+        "status_filter": status_filter,
+        "search_query": search_query,
+    })
+
+
+async def _alist(queryset) -> list:
+    return [row async for row in queryset]
@@ -0,0 +1,280 @@
+"""
+Latency and query-count baseline for every URL in ``support/urls.py``.
+
+Each route is requested through the Django test client against the
+current database, logged in as an IT admin for ``admin/`` routes and as
+the owner of a ticket otherwise. Path parameters are filled from existing
+rows, so run ``seed_load`` first for numbers that mean something.
+
+``compare_servers`` starts the app under gunicorn (WSGI, sync views) and
+uvicorn (ASGI, ``support.async_views``) in turn and measures throughput
+with a fixed number of concurrent keep-alive clients.
+"""
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import QueryDict
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, reverse
+
+from .exports import new_export_name, write_ticket_export
+from .models import Asset, Ticket
+from .urls import urlpatterns
+
+BENCHMARK_ADMIN = "benchmark_admin"
+# A narrow filter keeps the export written for ``export_download`` small.
+EXPORT_FILTERS = "status=open&urgency=high"
+
+# The pages with async versions, measured by ``compare_servers`` by default.
+READ_HEAVY_ROUTES = ["employee_dashboard", "ticket_detail", "admin_dashboard", "asset_list"]
+SERVERS = {
+    "wsgi": ["gunicorn", "it_helpdesk.wsgi:application", "--workers", "{workers}",
+             "--bind", "127.0.0.1:{port}", "--log-level", "warning"],
+    "asgi": ["uvicorn", "it_helpdesk.asgi:application", "--workers", "{workers}",
+             "--port", "{port}", "--log-level", "warning", "--no-access-log"],
+}
+
+
+def _percentile(ordered: list, percent: int) -> float:
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return round(ordered[index], 2)
+
+
+def _kwargs_for(pattern: URLPattern, row, created_files: list) -> dict:
+    """Fill a route's path parameters from existing rows."""
+    kwargs = {}
+    for name in pattern.pattern.converters:
+        if name == "pk":
+            kwargs[name] = row.pk
+        elif name == "variant":
+            kwargs[name] = "thumbnail"
+        elif name == "name":
+            kwargs[name] = new_export_name()
+            created_files.append(write_ticket_export(QueryDict(EXPORT_FILTERS), kwargs[name]))
+        else:
+            raise ValueError(f"No benchmark value for <{name}> in {pattern.name}")
+    return kwargs
+
+
+def benchmark_targets(created_files: list, only=None):
+    """
+    Return ``(url_name, path, role)`` for every named route, and the
+    newest ticket. Files written for the routes are added to ``created_files``.
+    """
+    ticket = Ticket.objects.order_by("-created_at", "-id").first()
+    asset = Asset.objects.order_by("id").first()
+    # Routes that need a ticket with a processed screenshot are skipped without one.
+    attachment = Ticket.objects.exclude(screenshot_thumbnail="").order_by("-id").first()
+    targets = []
+    for pattern in urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        if only and pattern.name not in only:
+            continue
+        if "asset" in pattern.name:
+            row = asset
+        elif "variant" in pattern.pattern.converters:
+            row = attachment
+        else:
+            row = ticket
+        if "pk" in pattern.pattern.converters and row is None:
+            continue
+        path = reverse(pattern.name, kwargs=_kwargs_for(pattern, row, created_files))
+        role = "admin" if path.startswith("/admin/") or pattern.name == "metrics" else "employee"
+        targets.append((pattern.name, path, role))
+    return targets, ticket
+
+
+def benchmark_users(ticket, create_user=False):
+    """
+    The users to request pages as: the first active staff user, and the
+    owner of ``ticket``. Without a staff user, ``create_user`` adds
+    ``benchmark_admin``; otherwise it is an error, so pointing the benchmark
+    at the wrong database never writes to it.
+    """
+    admin = User.objects.filter(is_staff=True, is_active=True).order_by("pk").first()
+    if admin is None:
+        if not create_user:
+            raise RuntimeError(
+                f"No active staff user to request admin pages as; create one or allow {BENCHMARK_ADMIN} to be created"
+            )
+        admin, _created = User.objects.get_or_create(
+            username=BENCHMARK_ADMIN, defaults={"is_staff": True}
+        )
+    employee = ticket.employee if ticket is not None else admin
+    return {"admin": admin, "employee": employee}
+
+
+def run_benchmark(iterations=20, warmup=2, only=None, create_user=False) -> dict:
+    """
+    Request every route ``warmup + iterations`` times and summarise.
+
+    Returns ``{url_name: {"path", "status", "p50_ms", "p95_ms", "max_ms",
+    "queries"}}``; ``queries`` is the median count over the timed runs.
+    """
+    created_files = []
+    try:
+        targets, ticket = benchmark_targets(created_files, only)
+        users = benchmark_users(ticket, create_user)
+        with override_settings(ALLOWED_HOSTS=["testserver"], REQUEST_PROFILING_SAMPLE_RATE=0):
+            return _measure(targets, users, iterations, warmup)
+    finally:
+        for path in created_files:
+            os.remove(path)
+
+
+def _measure(targets, users, iterations, warmup) -> dict:
+    client = Client()
+    results = {}
+    for name, path, role in targets:
+        timings, queries, status = [], [], None
+        for run in range(warmup + iterations):
+            # Log in again every time: the logout route ends the session.
+            client.force_login(users[role])
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path)
+                if response.streaming:
+                    for _chunk in response.streaming_content:
+                        pass
+                    response.close()
+                elapsed = (time.perf_counter() - started) * 1000
+            status = response.status_code
+            if run >= warmup:
+                timings.append(elapsed)
+                queries.append(len(captured))
+        timings.sort()
+        results[name] = {
+            "path": path,
+            "status": status,
+            "p50_ms": _percentile(timings, 50),
+            "p95_ms": _percentile(timings, 95),
+            "max_ms": round(timings[-1], 2),
+            "queries": statistics.median_low(queries),
+        }
+    return results
+
+
+def session_cookies(users: dict) -> dict:
+    """Log each user in once and return their ``Cookie`` header values."""
+    cookies = {}
+    for role, user in users.items():
+        client = Client()
+        client.force_login(user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        cookies[role] = f"{settings.SESSION_COOKIE_NAME}={cookie}"
+    return cookies
+
+
+def _wait_for_port(port: int, process, timeout=30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on port {port} within {timeout:.0f}s")
+
+
+def start_server(kind: str, port: int, workers: int):
+    """Start ``kind`` (``wsgi`` or ``asgi``) on ``port`` and wait until it listens."""
+    module, *args = SERVERS[kind]
+    command = [sys.executable, "-m", module] + [
+        arg.format(port=port, workers=workers) for arg in args
+    ]
+    env = dict(os.environ, ALLOWED_HOSTS="127.0.0.1", REQUEST_PROFILING_SAMPLE_RATE="0")
+    process = subprocess.Popen(command, env=env, cwd=settings.BASE_DIR)
+    try:
+        _wait_for_port(port, process)
+    except RuntimeError:
+        process.terminate()
+        process.wait()
+        raise
+    return process
+
+
+def load_test(port: int, targets, cookies: dict, concurrency=20, duration=10.0) -> dict:
+    """
+    Hit ``targets`` round-robin from ``concurrency`` keep-alive clients.
+
+    Returns requests per second, latency percentiles and the number of
+    requests that failed or did not return 200.
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed, index = [], 0, offset
+        while time.monotonic() < stop_at:
+            _name, path, role = targets[index % len(targets)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path, headers={"Cookie": cookies[role]})
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            local.append((time.perf_counter() - started) * 1000)
+            failed += not ok
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": _percentile(latencies, 50) if latencies else 0,
+        "p95_ms": _percentile(latencies, 95) if latencies else 0,
+    }
+
+
+def compare_servers(servers=("wsgi", "asgi"), routes=READ_HEAVY_ROUTES, workers=2,
+                    concurrency=20, duration=10.0, port=8765, create_user=False) -> dict:
+    """Run ``load_test`` against each server in turn; ``{server: result}``."""
+    created_files = []
+    try:
+        targets, ticket = benchmark_targets(created_files, routes)
+        cookies = session_cookies(benchmark_users(ticket, create_user))
+        results = {}
+        for kind in servers:
+            process = start_server(kind, port, workers)
+            try:
+                # One pass over every page first, so both servers start warm.
+                load_test(port, targets, cookies, concurrency=len(targets), duration=0.5)
+                results[kind] = load_test(port, targets, cookies, concurrency, duration)
+            finally:
+                process.terminate()
+                process.wait()
+        return results
+    finally:
+        for path in created_files:
+            os.remove(path)
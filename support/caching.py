@@ -0,0 +1,126 @@
+"""
+Cached dashboard stats and rendered table fragments.
+
+Entries are keyed by a per-namespace version number plus whatever the
+caller passes (user, filter parameters). Saving or deleting a ticket,
+comment or asset bumps the matching namespace version from
+``support.signals``, so every key built before the change is simply never
+read again and stale dashboards are not served.
+
+That only holds if every process sees the bumps, so nothing is cached
+while the default cache is process-local (``LocMemCache``): a write by
+another web worker, the task worker or a management command would go
+unnoticed until the entry expired.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+TICKETS = "tickets"
+ASSETS = "assets"
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _version_key(namespace: str) -> str:
+    return f"support:view:version:{namespace}"
+
+
+def namespace_version(namespace: str) -> int:
+    return cache.get_or_set(_version_key(namespace), 1, None)
+
+
+def _bump(namespace: str) -> None:
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), 2, None)
+
+
+def invalidate(*namespaces: str) -> None:
+    """
+    Drop every cached entry depending on ``namespaces``.
+
+    The version is bumped now, so the current request sees its own write,
+    and again on commit, so a reader that cached pre-commit data in
+    between is discarded too.
+    """
+    for namespace in namespaces:
+        _bump(namespace)
+    transaction.on_commit(lambda: [_bump(namespace) for namespace in namespaces])
+
+
+def cache_timeout() -> int:
+    """Seconds to cache view data for; 0 when the cache backend is per-process."""
+    if isinstance(caches["default"], LocMemCache):
+        return 0
+    return getattr(settings, "VIEW_CACHE_TIMEOUT", 300)
+
+
+def cache_key(name: str, namespaces, parts) -> str:
+    versions = ".".join(str(namespace_version(namespace)) for namespace in namespaces)
+    digest = hashlib.md5(repr(list(parts)).encode(), usedforsecurity=False).hexdigest()
+    return f"support:view:{name}:{versions}:{digest}"
+
+
+def _record(name: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[(name, outcome)] += 1
+
+
+def _lookup(name: str, namespaces, parts):
+    """Return ``(key, value)``; ``value`` is None on a miss."""
+    key = cache_key(name, namespaces, parts)
+    value = cache.get(key)
+    _record(name, "misses" if value is None else "hits")
+    return key, value
+
+
+def cached(name: str, namespaces, parts, compute):
+    """Return the cached value for ``name``/``parts``, computing it on a miss."""
+    timeout = cache_timeout()
+    if not timeout:
+        return compute()
+    key, value = _lookup(name, namespaces, parts)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+async def acached(name: str, namespaces, parts, compute):
+    """
+    ``cached`` for async views; ``compute`` is a coroutine function.
+
+    The version and entry lookups share one trip to a worker thread.
+    """
+    timeout = cache_timeout()
+    if not timeout:
+        return await compute()
+    key, value = await sync_to_async(_lookup)(name, namespaces, parts)
+    if value is None:
+        value = await compute()
+        await cache.aset(key, value, timeout)
+    return value
+
+
+def cache_stats() -> dict:
+    """Return ``{name: {"hits": n, "misses": n}}`` for this process."""
+    with _stats_lock:
+        items = list(_stats.items())
+    stats = {}
+    for (name, outcome), count in items:
+        stats.setdefault(name, {"hits": 0, "misses": 0})[outcome] = count
+    return stats
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,119 @@
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .caching import TICKETS, invalidate
+from .models import Ticket, TicketCounter
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("employee_id", "status", "category", "urgency", "assigned")
+
+
+def counter_key(ticket: Ticket) -> tuple:
+    """Return the counter key a ticket instance is counted under."""
+    return (
+        ticket.employee_id,
+        ticket.status,
+        ticket.category,
+        ticket.urgency,
+        ticket.assigned_to_id is not None,
+    )
+
+
+def stored_counter_key(pk) -> tuple:
+    """Return the counter key of the ticket as currently stored, or None."""
+    row = (
+        Ticket.objects.filter(pk=pk)
+        .values_list("employee_id", "status", "category", "urgency", "assigned_to_id")
+        .first()
+    )
+    if row is None:
+        return None
+    return row[:4] + (row[4] is not None,)
+
+
+def apply_delta(key: tuple, delta: int) -> None:
+    """Add ``delta`` to the counter row for ``key``, creating it if needed."""
+    if not delta:
+        return
+    lookup = dict(zip(COUNTER_FIELDS, key))
+    counters = TicketCounter.objects.filter(**lookup)
+    if delta < 0:
+        if not counters.filter(count__gte=-delta).update(count=F("count") + delta):
+            # The stored count is already too low; clamp at zero and flag the drift.
+            counters.update(count=0)
+            logger.warning(
+                "Ticket counter %s cannot drop by %d; clamped to 0. "
+                "Run rebuild_ticket_counters to repair it.", key, -delta,
+            )
+        return
+    if counters.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            TicketCounter.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Another writer created the row between our update and insert.
+        counters.update(count=F("count") + delta)
+
+
+def count_new_tickets(tickets: list) -> None:
+    """Add bulk-created tickets, which bypass the save signals, to the counters."""
+    deltas = {}
+    for ticket in tickets:
+        key = counter_key(ticket)
+        deltas[key] = deltas.get(key, 0) + 1
+    for key, delta in deltas.items():
+        apply_delta(key, delta)
+
+
+def compute_counters() -> dict:
+    """Recompute every counter from the ticket table, keyed like ``counter_key``."""
+    rows = (
+        Ticket.objects.order_by()
+        .values("employee_id", "status", "category", "urgency")
+        .annotate(
+            assigned_count=Count("id", filter=Q(assigned_to__isnull=False)),
+            unassigned_count=Count("id", filter=Q(assigned_to__isnull=True)),
+        )
+    )
+    counts = {}
+    for row in rows:
+        base = (row["employee_id"], row["status"], row["category"], row["urgency"])
+        if row["assigned_count"]:
+            counts[base + (True,)] = row["assigned_count"]
+        if row["unassigned_count"]:
+            counts[base + (False,)] = row["unassigned_count"]
+    return counts
+
+
+def stored_counters() -> dict:
+    """Return the non-zero counters currently stored in the table."""
+    rows = TicketCounter.objects.filter(count__gt=0).values_list(*COUNTER_FIELDS, "count")
+    return {row[:5]: row[5] for row in rows}
+
+
+def counter_drift() -> dict:
+    """Return ``{key: (stored, expected)}`` for every counter that disagrees."""
+    expected = compute_counters()
+    stored = stored_counters()
+    return {
+        key: (stored.get(key, 0), expected.get(key, 0))
+        for key in expected.keys() | stored.keys()
+        if stored.get(key, 0) != expected.get(key, 0)
+    }
+
+
+@transaction.atomic
+def rebuild_ticket_counters() -> int:
+    """Replace the counter table with values recomputed from scratch."""
+    counts = compute_counters()
+    TicketCounter.objects.all().delete()
+    TicketCounter.objects.bulk_create(
+        TicketCounter(count=count, **dict(zip(COUNTER_FIELDS, key)))
+        for key, count in counts.items()
+    )
+    invalidate(TICKETS)
+    return len(counts)
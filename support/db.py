@@ -0,0 +1,90 @@
+"""
+SQLite connection tuning and the optional read-replica split.
+
+Every new SQLite connection gets the pragmas in ``settings.SQLITE_PRAGMAS``
+(WAL, ``synchronous=NORMAL``, a busy timeout and larger caches) so several
+gunicorn workers can write without ``database is locked`` errors. When
+``settings.READ_REPLICA_ALIAS`` names a second, read-only alias, views
+wrapped in ``reads_from_replica`` send their reads there.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+# Pragmas that change the database file cannot run on a read-only connection.
+PERSISTENT_PRAGMAS = {"journal_mode"}
+
+
+def is_read_only(connection) -> bool:
+    return "mode=ro" in str(connection.settings_dict["NAME"])
+
+
+def configure_sqlite_connection(connection) -> None:
+    """Apply ``settings.SQLITE_PRAGMAS`` to a freshly opened SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if read_only and name in PERSISTENT_PRAGMAS:
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def replica_alias():
+    return getattr(settings, "READ_REPLICA_ALIAS", None)
+
+
+def reads_from_replica(view):
+    """Route the ORM reads a view makes to the read-only alias, if configured."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            # The async ORM's worker threads inherit this context variable.
+            token = _replica_reads.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """Send reads inside ``reads_from_replica`` to the replica, all writes to default."""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias and _replica_reads.get():
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Without this, saving an object read from the replica would
+        # follow the instance back to the read-only alias.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == replica_alias():
+            return False
+        return None
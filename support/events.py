@@ -0,0 +1,126 @@
+"""
+The ticket event log.
+
+Status, assignee and urgency changes are recorded as ``TicketEvent`` rows
+with the raw old and new values, so reports filter and group on indexed
+columns instead of parsing comment text. The ticket timeline merges these
+events with the comments, newest first, and renders each event as the
+sentence the old activity comments used.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+
+from .models import Ticket, TicketEvent
+
+BUCKETS = {"hour": TruncHour, "day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+LABELS = {
+    "status": dict(Ticket.STATUS_CHOICES),
+    "urgency": dict(Ticket.URGENCY_CHOICES),
+}
+BATCH_SIZE = 1000
+
+
+def ticket_changes(ticket: Ticket, actor, at, old_status, old_assigned_id, old_urgency) -> list:
+    """Unsaved events for whatever an update changed, compared to the old values."""
+    changes = [
+        ("status", old_status, ticket.status),
+        ("assigned", old_assigned_id or "", ticket.assigned_to_id or ""),
+        ("urgency", old_urgency, ticket.urgency),
+    ]
+    return [
+        TicketEvent(
+            ticket=ticket, actor=actor, event_type=event_type,
+            old_value=str(old), new_value=str(new), created_at=at,
+        )
+        for event_type, old, new in changes
+        if old != new
+    ]
+
+
+def created_events(tickets, actor=None) -> list:
+    """Unsaved "created" events; the actor defaults to each ticket's employee."""
+    return [
+        TicketEvent(
+            ticket=ticket,
+            actor_id=actor.pk if actor else ticket.employee_id,
+            event_type="created",
+            new_value=ticket.status,
+            created_at=ticket.created_at,
+        )
+        for ticket in tickets
+    ]
+
+
+def record_events(events: list) -> list:
+    """Insert events in batches; returns them with primary keys set."""
+    return TicketEvent.objects.bulk_create(events, batch_size=BATCH_SIZE)
+
+
+def newest_events(ticket_id, limit):
+    """The ``limit`` newest timeline events of a ticket, with their actors."""
+    return (
+        TicketEvent.objects.filter(ticket_id=ticket_id)
+        .exclude(event_type="created")
+        .select_related("actor")
+        .order_by("-created_at", "-id")[:limit]
+    )
+
+
+def _user_names(user_ids) -> dict:
+    users = User.objects.filter(pk__in=user_ids).only("username", "first_name", "last_name")
+    return {str(user.pk): user.get_full_name() or user.username for user in users}
+
+
+def describe_events(entries) -> None:
+    """
+    Set ``summary`` on the events among timeline ``entries``.
+
+    Assignee names are looked up with one query, only if needed.
+    """
+    events = [entry for entry in entries if isinstance(entry, TicketEvent)]
+    user_ids = {
+        value
+        for event in events if event.event_type == "assigned"
+        for value in (event.old_value, event.new_value) if value
+    }
+    names = _user_names(user_ids) if user_ids else {}
+    for event in events:
+        if event.event_type == "assigned":
+            old = names.get(event.old_value, "Unassigned")
+            new = names.get(event.new_value, "Unassigned")
+            event.summary = f"Ticket reassigned from {old} to {new}"
+        else:
+            labels = LABELS.get(event.event_type, {})
+            old = labels.get(event.old_value, event.old_value)
+            new = labels.get(event.new_value, event.new_value)
+            event.summary = f"{event.get_event_type_display()} from {old} to {new}"
+
+
+def merge_timeline(comments: list, events: list) -> list:
+    """Merge two newest-first lists into one, newest first."""
+    return sorted(comments + events, key=lambda entry: entry.created_at, reverse=True)
+
+
+def event_counts(event_type: str, bucket="day", since=None, until=None) -> list:
+    """
+    Count events of one type per time bucket and new value.
+
+    Returns ``[{"bucket": datetime, "value": new_value, "count": n}]`` in
+    bucket order; served by the ``(event_type, created_at)`` index.
+    """
+    events = TicketEvent.objects.filter(event_type=event_type)
+    if since is not None:
+        events = events.filter(created_at__gte=since)
+    if until is not None:
+        events = events.filter(created_at__lt=until)
+    rows = (
+        events.annotate(period=BUCKETS[bucket]("created_at"))
+        .values("period", "new_value")
+        .annotate(count=Count("id"))
+        .order_by("period", "new_value")
+    )
+    return [
+        {"bucket": row["period"], "value": row["new_value"], "count": row["count"]}
+        for row in rows
+    ]
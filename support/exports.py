@@ -0,0 +1,200 @@
+"""
+Ticket CSV export.
+
+Rows are read with ``values_list().iterator()`` and labelled from the choice
+maps, so memory stays flat however many tickets match. Large exports can
+be written to ``MEDIA_ROOT/exports`` by a background thread and downloaded
+when ready. A failed export leaves a ``.failed`` marker in place of its
+``.part`` file, and so does one whose ``.part`` file stops changing for
+``settings.EXPORT_STALE_SECONDS`` (its thread died with its process), so the
+download page reports the failure instead of "pending" or "not found".
+``purge_exports`` removes files older than ``settings.EXPORT_RETENTION_DAYS``.
+"""
+import csv
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .filters import filter_tickets
+from .models import Ticket
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+EXPORT_DIR = "exports"
+EXPORT_NAME_RE = re.compile(r"^tickets_\d{8}_\d{6}_[0-9a-f]{16}\.csv$")
+
+EXPORT_FILTER_PARAMS = ("status", "category", "urgency", "search")
+
+TICKET_CSV_HEADER = [
+    "ID", "Title", "Customer Name", "Customer Email", "Customer Phone", "Customer Alternate Phone",
+    "Employee", "Category", "Urgency", "Status",
+    "Assigned To", "Created At", "Description",
+]
+
+TICKET_CSV_FIELDS = [
+    "id", "title", "customer_name", "customer_email", "customer_phone",
+    "customer_alternate_phone", "employee__username", "category", "urgency",
+    "status", "assigned_to__username", "created_at", "description",
+]
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def ticket_csv_rows(params):
+    """Yield the header and one list per ticket matching the dashboard filters."""
+    categories = dict(Ticket.CATEGORY_CHOICES)
+    urgencies = dict(Ticket.URGENCY_CHOICES)
+    statuses = dict(Ticket.STATUS_CHOICES)
+
+    tickets = filter_tickets(Ticket.objects.all(), params).values_list(*TICKET_CSV_FIELDS)
+
+    yield TICKET_CSV_HEADER
+    for (pk, title, customer_name, customer_email, customer_phone, alternate_phone,
+         employee, category, urgency, status, assignee, created_at,
+         description) in tickets.iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            pk,
+            title,
+            customer_name or "",
+            customer_email or "",
+            customer_phone or "",
+            alternate_phone or "",
+            employee,
+            categories.get(category, category),
+            urgencies.get(urgency, urgency),
+            statuses.get(status, status),
+            assignee or "Unassigned",
+            created_at.strftime("%Y-%m-%d %H:%M"),
+            description[:100],  # Truncate long descriptions
+        ]
+
+
+def stream_ticket_csv(params):
+    """Yield encoded CSV lines for a StreamingHttpResponse."""
+    writer = csv.writer(Echo())
+    for row in ticket_csv_rows(params):
+        yield writer.writerow(row)
+
+
+def export_querystring(params) -> str:
+    """Keep only the dashboard filters, for links to the export view."""
+    filters = params.copy()
+    for key in list(filters):
+        if key not in EXPORT_FILTER_PARAMS:
+            del filters[key]
+    return filters.urlencode()
+
+
+def export_path(name: str) -> str:
+    return os.path.join(settings.MEDIA_ROOT, EXPORT_DIR, name)
+
+
+def new_export_name() -> str:
+    stamp = timezone.now().strftime("%Y%m%d_%H%M%S")
+    return f"tickets_{stamp}_{secrets.token_hex(8)}.csv"
+
+
+def write_ticket_export(params, name: str) -> str:
+    """
+    Write a filtered ticket export to ``MEDIA_ROOT/exports/<name>``.
+
+    The file is written under a ``.part`` name and renamed when complete,
+    so a half-written export is never served.
+    """
+    path = export_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.part"
+    with open(partial, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        for row in ticket_csv_rows(params):
+            writer.writerow(row)
+    os.replace(partial, path)
+    return path
+
+
+def start_background_export(params) -> str:
+    """Generate an export in a background thread and return its file name."""
+    name = new_export_name()
+    params = params.copy()
+    path = export_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(f"{path}.part", "w").close()
+
+    def run():
+        try:
+            write_ticket_export(params, name)
+        except Exception:
+            logger.exception("Ticket export %s failed", name)
+            _mark_failed(path)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name=f"export-{name}", daemon=True).start()
+    return name
+
+
+def stale_after() -> int:
+    return getattr(settings, "EXPORT_STALE_SECONDS", 600)
+
+
+def _mark_failed(path: str) -> None:
+    """Replace an export's ``.part`` file with a ``.failed`` marker."""
+    open(f"{path}.failed", "w").close()
+    try:
+        os.remove(f"{path}.part")
+    except OSError:
+        pass
+
+
+def export_status(name: str, now=None) -> str:
+    """Return ``ready``, ``pending``, ``failed`` or ``missing`` for an export file name."""
+    if not EXPORT_NAME_RE.match(name):
+        return "missing"
+    path = export_path(name)
+    if os.path.exists(path):
+        return "ready"
+    if os.path.exists(f"{path}.failed"):
+        return "failed"
+    partial = f"{path}.part"
+    try:
+        modified = os.path.getmtime(partial)
+    except OSError:
+        return "missing"
+    if (now or time.time()) - modified < stale_after():
+        return "pending"
+    logger.warning("Ticket export %s stalled; removing %s", name, partial)
+    _mark_failed(path)
+    return "failed"
+
+
+def purge_exports(days=None, now=None) -> int:
+    """Delete export files and markers older than ``days``; returns how many."""
+    days = getattr(settings, "EXPORT_RETENTION_DAYS", 7) if days is None else days
+    cutoff = (now or time.time()) - days * 86400
+    directory = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR)
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if entry.is_file() and entry.name.startswith("tickets_") and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
@@ -0,0 +1,39 @@
+from .models import Ticket, Asset
+from .search import search_assets, search_tickets
+
+
+def filter_tickets(tickets, params):
+    """Apply the admin dashboard status/category/urgency/search filters."""
+    status_filter = params.get("status") or ""
+    category_filter = params.get("category") or ""
+    urgency_filter = params.get("urgency") or ""
+    search_query = params.get("search") or ""
+
+    if status_filter:
+        tickets = tickets.filter(status=status_filter)
+    if category_filter:
+        tickets = tickets.filter(category=category_filter)
+    if urgency_filter:
+        tickets = tickets.filter(urgency=urgency_filter)
+    if search_query:
+        tickets = search_tickets(tickets, search_query)
+    return tickets
+
+
+def admin_ticket_queryset(params):
+    """Tickets listed on the admin dashboard for the given query params."""
+    tickets = Ticket.objects.select_related("employee", "assigned_to").all()
+    return filter_tickets(tickets, params)
+
+
+def asset_queryset(params):
+    """Assets listed on the asset page for the given query params."""
+    status_filter = params.get("status") or ""
+    search_query = params.get("search") or ""
+
+    assets = Asset.objects.select_related("assigned_to").all()
+    if status_filter:
+        assets = assets.filter(status=status_filter)
+    if search_query:
+        assets = search_assets(assets, search_query)
+    return assets
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
+from django.core.files.uploadedfile import UploadedFile
 
+from .attachments import process_screenshot
 from .models import Ticket, Asset, TicketComment
 
 
@@ -39,7 +41,7 @@ class TicketForm(forms.ModelForm):
             ),
             "urgency": forms.Select(attrs={"class": "form-select"}),
             "screenshot": forms.ClearableFileInput(
-                attrs={"class": "form-control"}
+                attrs={"class": "form-control", "accept": "image/png,image/jpeg,image/webp"}
             ),
             "customer_name": forms.TextInput(
                 attrs={"class": "form-control", "placeholder": "Enter customer name"}
@@ -62,6 +64,19 @@ class TicketForm(forms.ModelForm):
         self.fields["customer_phone"].required = True
         self.fields["customer_email"].required = True
 
+    def clean_screenshot(self):
+        screenshot = self.cleaned_data.get("screenshot")
+        if isinstance(screenshot, UploadedFile):
+            self.screenshot_files = process_screenshot(screenshot)
+            return self.screenshot_files["screenshot"]
+        return screenshot
+
+    def save(self, commit=True):
+        # The preview and thumbnail are not form fields, so set them here.
+        for field, content in getattr(self, "screenshot_files", {}).items():
+            setattr(self.instance, field, content)
+        return super().save(commit)
+
 
 class TicketUpdateForm(forms.ModelForm):
     class Meta:
@@ -130,3 +145,69 @@ class TicketCommentForm(forms.ModelForm):
             ),
         }
 
+
+class AssetImportForm(AssetForm):
+    """
+    Validate one imported asset row with the AssetForm rules.
+
+    ``assigned_to`` is resolved by username and ``serial_number`` uniqueness
+    is checked for the whole batch by the importer, so neither costs a query
+    per row here.
+    """
+
+    class Meta(AssetForm.Meta):
+        fields = [name for name in AssetForm.Meta.fields if name != "assigned_to"]
+
+    def validate_unique(self):
+        pass
+
+
+class TicketImportForm(TicketForm):
+    """Validate one imported ticket row with the TicketForm rules."""
+
+    status = forms.ChoiceField(choices=Ticket.STATUS_CHOICES, required=False)
+
+    class Meta(TicketForm.Meta):
+        fields = [name for name in TicketForm.Meta.fields if name != "screenshot"]
+
+    def clean_status(self):
+        return self.cleaned_data["status"] or "open"
+
+    def validate_unique(self):
+        pass
+
+
+class ImportUploadForm(forms.Form):
+    KIND_CHOICES = [("assets", "Assets"), ("tickets", "Tickets")]
+
+    kind = forms.ChoiceField(
+        choices=KIND_CHOICES, widget=forms.Select(attrs={"class": "form-select"})
+    )
+    file = forms.FileField(
+        help_text="CSV with a header row, a JSON array or JSON Lines.",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control"}),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        label="Validate only",
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
+
+
+class InventoryForm(forms.Form):
+    day = forms.DateField(
+        required=False,
+        label="On",
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+    device_type = forms.CharField(
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "All devices"}),
+    )
+    serial_number = forms.CharField(
+        required=False,
+        max_length=100,
+        label="Serial number",
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "Who had this serial?"}),
+    )
@@ -0,0 +1,248 @@
+"""
+Bulk import of assets and tickets from CSV, JSON or JSON Lines.
+
+Rows are validated with the existing form rules, then written with
+``bulk_create`` one batch per transaction. Lookups the forms would do per
+row (users by username, ``serial_number`` uniqueness) are done once per
+batch with set-based queries instead.
+"""
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+from .asset_history import opening_intervals
+from .caching import ASSETS, TICKETS, invalidate
+from .counters import count_new_tickets
+from .events import created_events, record_events
+from .forms import AssetImportForm, TicketImportForm
+from .metrics import record_created_tickets
+from .models import Asset, AssetAssignment, Ticket
+from .search import index_new_assets, index_new_tickets
+from .sla import stamp_ticket
+
+BATCH_SIZE = 1000
+
+
+def read_rows(handle, format_name):
+    """Yield ``(line_number, row_dict)`` from a text file handle."""
+    if format_name == "csv":
+        reader = csv.DictReader(handle)
+        try:
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error as exc:
+            raise ValueError(f"line {reader.reader.line_num}: {exc}") from exc
+    elif format_name == "jsonl":
+        for line_number, line in enumerate(handle, start=1):
+            if line.strip():
+                yield line_number, _object(line_number, json.loads(line))
+    elif format_name == "json":
+        for index, row in enumerate(json.load(handle), start=1):
+            yield index, _object(index, row)
+    else:
+        raise ValueError(f"Unknown import format: {format_name}")
+
+
+def _object(line, row):
+    if not isinstance(row, dict):
+        raise ValueError(f"line {line}: expected an object")
+    return row
+
+
+def guess_format(filename: str) -> str:
+    for extension in ("jsonl", "json", "csv"):
+        if filename.lower().endswith(f".{extension}"):
+            return extension
+    return "csv"
+
+
+def text_handle(uploaded_file):
+    """Wrap an uploaded binary file for ``read_rows``."""
+    return io.TextIOWrapper(uploaded_file.file, encoding="utf-8-sig", newline="")
+
+
+def _cell(row, name):
+    value = row.get(name)
+    return "" if value is None else str(value).strip()
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.rows = 0
+        self.errors = []
+
+    def add_error(self, line, messages):
+        self.errors.append((line, messages))
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def write_errors(self, handle):
+        writer = csv.writer(handle)
+        writer.writerow(["line", "errors"])
+        for line, messages in self.errors:
+            writer.writerow([line, "; ".join(messages)])
+
+
+def _validate(form, data):
+    """
+    Rebind ``form`` to ``data`` and a fresh instance, then validate it.
+
+    Constructing a form deep-copies every field, which dominates the cost of
+    a large import, so one form per batch is reused for all of its rows.
+    """
+    form.data = data
+    form.is_bound = True
+    form._errors = None
+    form.instance = form._meta.model()
+    return form.is_valid()
+
+
+def _form_errors(form):
+    return [
+        f"{field}: {message}" if field != "__all__" else message
+        for field, messages in form.errors.items()
+        for message in messages
+    ]
+
+
+class BaseImporter:
+    model = None
+
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.report = ImportReport()
+
+    def run(self, rows):
+        """Import ``(line, row)`` pairs and return an ``ImportReport``."""
+        batch = []
+        for line, row in rows:
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+        return self.report
+
+    def _users(self, batch, *columns):
+        usernames = {_cell(row, column) for _line, row in batch for column in columns}
+        usernames.discard("")
+        return {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+    def _import_batch(self, batch):
+        self.report.rows += len(batch)
+        valid = self.build(batch)
+        if self.dry_run or not valid:
+            return
+        try:
+            with transaction.atomic():
+                created = self.model.objects.bulk_create([instance for _line, instance in valid])
+                self.after_create(created)
+        except IntegrityError as exc:
+            # e.g. a serial number saved by someone else since the batch was checked.
+            for line, _instance in valid:
+                self.report.add_error(line, [f"not imported, its batch conflicts with existing data: {exc}"])
+            return
+        self.report.created += len(created)
+
+    def build(self, batch):
+        """Validate ``batch``; return ``(line, instance)`` for the rows to create."""
+        raise NotImplementedError
+
+    def after_create(self, instances):
+        pass
+
+
+class AssetImporter(BaseImporter):
+    model = Asset
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen_serials = set()
+
+    def build(self, batch):
+        users = self._users(batch, "assigned_to")
+        serials = [_cell(row, "serial_number") for _line, row in batch]
+        taken = set(
+            Asset.objects.filter(serial_number__in=serials).values_list("serial_number", flat=True)
+        )
+
+        assets = []
+        seen = self.seen_serials
+        form = AssetImportForm(data={})
+        for line, row in batch:
+            data = {name: _cell(row, name) for name in AssetImportForm.Meta.fields}
+            errors = [] if _validate(form, data) else _form_errors(form)
+            serial = data["serial_number"]
+            if serial and serial in seen:
+                errors.append(f"serial_number: {serial} appears more than once in the file")
+            elif serial in taken:
+                errors.append(f"serial_number: {serial} already exists")
+            username = _cell(row, "assigned_to")
+            if username and username not in users:
+                errors.append(f"assigned_to: unknown user {username}")
+            if errors:
+                self.report.add_error(line, errors)
+                continue
+            seen.add(serial)
+            asset = form.instance
+            asset.assigned_to = users.get(username)
+            assets.append((line, asset))
+        return assets
+
+    def after_create(self, instances):
+        AssetAssignment.objects.bulk_create(opening_intervals(instances), batch_size=BATCH_SIZE)
+        index_new_assets(instances)
+        invalidate(ASSETS)
+
+
+class TicketImporter(BaseImporter):
+    model = Ticket
+
+    def build(self, batch):
+        users = self._users(batch, "employee", "assigned_to")
+        tickets = []
+        form = TicketImportForm(data={})
+        for line, row in batch:
+            data = {name: _cell(row, name) for name in TicketImportForm.Meta.fields}
+            data["status"] = _cell(row, "status")
+            errors = [] if _validate(form, data) else _form_errors(form)
+            employee = _cell(row, "employee")
+            assignee = _cell(row, "assigned_to")
+            if not employee:
+                errors.append("employee: This field is required.")
+            elif employee not in users:
+                errors.append(f"employee: unknown user {employee}")
+            if assignee and assignee not in users:
+                errors.append(f"assigned_to: unknown user {assignee}")
+            if errors:
+                self.report.add_error(line, errors)
+                continue
+            ticket = form.instance
+            ticket.status = form.cleaned_data["status"]
+            ticket.resolution_notes = _cell(row, "resolution_notes")
+            ticket.employee = users[employee]
+            ticket.assigned_to = users.get(assignee)
+            stamp_ticket(ticket)  # bulk_create skips the pre_save signal
+            tickets.append((line, ticket))
+        return tickets
+
+    def after_create(self, instances):
+        count_new_tickets(instances)
+        index_new_tickets(instances)
+        record_created_tickets(instances)
+        record_events(created_events(instances))
+        invalidate(TICKETS)
+
+
+IMPORTERS = {
+    "assets": AssetImporter,
+    "tickets": TicketImporter,
+}
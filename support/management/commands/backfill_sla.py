@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from support.sla import backfill_sla
+
+
+class Command(BaseCommand):
+    help = "Fill in ticket SLA due dates and timestamps from the comment history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every ticket, not only those without SLA fields.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = backfill_sla(
+            batch_size=options["batch_size"],
+            only_missing=not options["all"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        self.stdout.write(f"Backfilled {updated} tickets in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from support.benchmark import READ_HEAVY_ROUTES, SERVERS, compare_servers
+
+
+class Command(BaseCommand):
+    help = "Compare throughput of the read-heavy pages under gunicorn (WSGI) and uvicorn (ASGI)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["wsgi", "asgi"])
+        parser.add_argument("--only", nargs="+", metavar="URL_NAME", default=READ_HEAVY_ROUTES)
+        parser.add_argument("--workers", type=int, default=2, help="Server worker processes.")
+        parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--create-user", action="store_true",
+            help="Create a benchmark_admin staff user if the database has no staff user.",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        try:
+            results = compare_servers(
+                servers=options["servers"],
+                routes=options["only"],
+                workers=options["workers"],
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                port=options["port"],
+                create_user=options["create_user"],
+            )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from support.bulk_export import DATASETS, WRITERS, export_dataset
+
+
+class Command(BaseCommand):
+    help = "Export tickets, comments or assets as CSV, JSON Lines or columnar JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument("--format", default="jsonl", choices=sorted(WRITERS))
+        parser.add_argument(
+            "--output",
+            help="File to write; defaults to <dataset>.<extension>. Use '-' for stdout.",
+        )
+        parser.add_argument(
+            "--feed",
+            help="Incremental feed name; only rows newer than its last export are written.",
+        )
+
+    def handle(self, *args, **options):
+        dataset = options["dataset"]
+        writer = WRITERS[options["format"]]
+        output = options["output"] or f"{dataset}.{writer.extension}"
+
+        if output == "-":
+            count = export_dataset(dataset, options["format"], sys.stdout, feed=options["feed"])
+        else:
+            try:
+                with open(output, "w", newline="", encoding="utf-8") as handle:
+                    count = export_dataset(dataset, options["format"], handle, feed=options["feed"])
+            except OSError as exc:
+                raise CommandError(f"Cannot write {output}: {exc}")
+            self.stdout.write(f"Exported {count} {dataset} rows to {output}")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from support.imports import BATCH_SIZE, IMPORTERS, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import assets or tickets from a CSV, JSON or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "json", "jsonl"])
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Validate rows without saving them."
+        )
+        parser.add_argument("--report", help="Write per-row errors to this CSV file.")
+
+    def handle(self, *args, **options):
+        format_name = options["format"] or guess_format(options["path"])
+        importer = IMPORTERS[options["kind"]](
+            batch_size=options["batch_size"], dry_run=options["dry_run"]
+        )
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as handle:
+                report = importer.run(read_rows(handle, format_name))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot import {options['path']}: {exc}")
+
+        if options["report"]:
+            with open(options["report"], "w", newline="", encoding="utf-8") as handle:
+                report.write_errors(handle)
+        else:
+            for line, messages in report.errors:
+                self.stdout.write(f"Line {line}: {'; '.join(messages)}")
+
+        action = "Validated" if options["dry_run"] else "Imported"
+        count = report.rows - report.failed if options["dry_run"] else report.created
+        self.stdout.write(
+            f"{action} {count} of {report.rows} {options['kind']} rows ({report.failed} failed)"
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from support.attachments import process_stored_screenshots
+
+
+class Command(BaseCommand):
+    help = "Strip metadata from stored ticket screenshots and build their previews and thumbnails"
+
+    def handle(self, *args, **options):
+        counts = process_stored_screenshots()
+        self.stdout.write(
+            f"Processed {counts['processed']} screenshots ({counts['skipped']} skipped)"
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from support.search import rebuild_search_index, search_enabled
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for tickets and assets"
+
+    def handle(self, *args, **kwargs):
+        if not search_enabled():
+            self.stdout.write("Full-text index is only used on SQLite; nothing to rebuild")
+            return
+
+        counts = rebuild_search_index()
+        self.stdout.write(
+            f"Indexed {counts['tickets']} tickets and {counts['assets']} assets"
+        )
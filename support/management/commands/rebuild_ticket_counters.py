@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from support.counters import counter_drift, rebuild_ticket_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the ticket counters table and report drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift; exit with status 1 if any is found.",
+        )
+
+    def handle(self, *args, **options):
+        drift = counter_drift()
+        for key, (stored, expected) in sorted(drift.items(), key=str):
+            employee_id, status, category, urgency, assigned = key
+            self.stdout.write(
+                f"Drift employee={employee_id} status={status} category={category} "
+                f"urgency={urgency} assigned={assigned}: stored {stored}, expected {expected}"
+            )
+
+        if options["check"]:
+            if drift:
+                self.stderr.write(f"{len(drift)} counter(s) out of date")
+                raise SystemExit(1)
+            self.stdout.write("Ticket counters are up to date")
+            return
+
+        rows = rebuild_ticket_counters()
+        self.stdout.write(f"Rebuilt {rows} ticket counter rows ({len(drift)} drifted)")
@@ -0,0 +1,28 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from support.reports import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Update the daily ticket rollups behind the dashboard trend charts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since", type=date.fromisoformat,
+            help="First day to recompute (YYYY-MM-DD); defaults to the newest stored day.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every day from the first ticket, e.g. after reopened tickets.",
+        )
+
+    def handle(self, *args, **options):
+        if options["since"] and options["all"]:
+            raise CommandError("--since and --all cannot be combined")
+        started = time.perf_counter()
+        days = refresh_rollups(since=options["since"], rebuild=options["all"])
+        self.stdout.write(f"Refreshed {days} days in {time.perf_counter() - started:.1f}s")
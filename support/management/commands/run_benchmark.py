@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from support.benchmark import run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Request every support URL and report p50/p95 latency and query counts as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="+", metavar="URL_NAME", help="Benchmark these routes only.")
+        parser.add_argument("--no-cache", action="store_true", help="Disable the view cache while measuring.")
+        parser.add_argument("--output", help="File to write; defaults to stdout.")
+        parser.add_argument(
+            "--create-user", action="store_true",
+            help="Create a benchmark_admin staff user if the database has no staff user.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1")
+        overrides = {"VIEW_CACHE_TIMEOUT": 0} if options["no_cache"] else {}
+        try:
+            with override_settings(**overrides):
+                results = run_benchmark(
+                    iterations=options["iterations"], warmup=options["warmup"], only=options["only"],
+                    create_user=options["create_user"],
+                )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        report = json.dumps(results, indent=2)
+        if not options["output"]:
+            self.stdout.write(report)
+            return
+        try:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(report + "\n")
+        except OSError as exc:
+            raise CommandError(f"Cannot write {options['output']}: {exc}")
+        self.stdout.write(f"Wrote results for {len(results)} URLs to {options['output']}")
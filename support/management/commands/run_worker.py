@@ -0,0 +1,83 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from support.exports import purge_exports
+from support.reports import schedule_refresh
+from support.taskqueue import Worker, purge_finished
+
+# Housekeeping interval: purge old tasks and exports, queue a rollup refresh.
+PURGE_EVERY = 3600
+
+
+def work(batch_size, poll_interval, burst):
+    """Run one worker until SIGTERM/SIGINT, finishing the task in hand first."""
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    worker = Worker(batch_size=batch_size)
+    next_purge = time.monotonic()
+
+    def should_stop():
+        nonlocal next_purge
+        if time.monotonic() >= next_purge:
+            purge_finished(settings.TASK_RETENTION_DAYS)
+            purge_exports()
+            schedule_refresh()
+            next_purge = time.monotonic() + PURGE_EVERY
+        return bool(stopping)
+
+    return worker.run(poll_interval=poll_interval, burst=burst, should_stop=should_stop)
+
+
+class Command(BaseCommand):
+    help = "Run background task workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to start.")
+        parser.add_argument("--batch-size", type=int, default=10, help="Tasks claimed at a time.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle.")
+        parser.add_argument(
+            "--burst", action="store_true", help="Exit once no task is due instead of polling."
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes must be at least 1")
+        job = (options["batch_size"], options["poll_interval"], options["burst"])
+        if options["processes"] == 1:
+            processed = work(*job)
+            self.stdout.write(f"Processed {processed} tasks")
+            return
+
+        # Children must not inherit the parent's open database connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        children = [
+            context.Process(target=work, args=job, name=f"run_worker-{number}")
+            for number in range(options["processes"])
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f"Started {len(children)} workers")
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
+        failed = [child.name for child in children if child.exitcode]
+        if failed:
+            raise CommandError(f"Workers exited with errors: {', '.join(failed)}")
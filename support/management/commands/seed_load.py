@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from support.seeding import BATCH_SIZE, LoadSeeder
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, tickets, comments and assets for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--tickets", type=int, default=100000)
+        parser.add_argument("--comments", type=int, default=200000)
+        parser.add_argument("--assets", type=int, default=5000)
+        parser.add_argument("--days", type=int, default=365, help="Spread tickets over this many days.")
+        parser.add_argument("--seed", type=int, help="RNG seed, for repeatable data sets.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--skip-index", action="store_true", help="Do not rebuild the search index afterwards."
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1")
+        seeder = LoadSeeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            days=options["days"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        started = time.perf_counter()
+        counts = seeder.run(
+            options["users"],
+            options["tickets"],
+            options["comments"],
+            options["assets"],
+            index=not options["skip_index"],
+        )
+        self.stdout.write(
+            f"Created {counts['users']} users, {counts['tickets']} tickets, "
+            f"{counts['comments']} comments, {counts['events']} events and {counts['assets']} assets "
+            f"in {time.perf_counter() - started:.1f}s (run {seeder.run_id})"
+        )
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from support.warranty import report_assets, warranty_email, write_warranty_csv
+
+
+class Command(BaseCommand):
+    help = "Report assets whose warranty has expired or expires soon, by assignee and device type"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, help="Include warranties expiring within this many days (default 30)."
+        )
+        parser.add_argument(
+            "--skip-expired", action="store_true", help="Leave out warranties that already expired."
+        )
+        parser.add_argument("--output", default="-", help="CSV file to write; '-' for stdout.")
+        parser.add_argument(
+            "--email", nargs="+", metavar="ADDRESS",
+            help="Email per-group totals to these addresses instead of writing CSV.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 0:
+            raise CommandError("--days cannot be negative")
+        assets = report_assets(options["days"], include_expired=not options["skip_expired"])
+
+        if options["email"]:
+            warranty_email(options["email"], assets, options["days"]).send()
+            self.stdout.write(f"Emailed the warranty report to {', '.join(options['email'])}")
+            return
+        if options["output"] == "-":
+            write_warranty_csv(sys.stdout, assets)
+            return
+        try:
+            with open(options["output"], "w", newline="", encoding="utf-8") as handle:
+                count = write_warranty_csv(handle, assets)
+        except OSError as exc:
+            raise CommandError(f"Cannot write {options['output']}: {exc}")
+        self.stdout.write(f"Wrote {count} assets to {options['output']}")
@@ -0,0 +1,277 @@
+"""
+Business metrics in the Prometheus text exposition format.
+
+Counters and histograms are updated in-process as tickets are created and
+resolved. With ``settings.METRICS_DIR`` set, every process also writes its
+samples to its own file in that directory, and a scrape sums the files, so
+any gunicorn worker can answer ``/metrics`` for all of them. Clear the
+directory when the service is (re)deployed.
+
+Gauges are computed at scrape time from the small ``TicketCounter`` table,
+never from the ticket table itself.
+"""
+import json
+import math
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import Ticket, TicketCounter
+from .stats import ACTIVE_STATUSES
+
+HOUR = 3600
+RESOLVE_BUCKETS = (HOUR, 4 * HOUR, 8 * HOUR, 24 * HOUR, 3 * 24 * HOUR, 7 * 24 * HOUR, 30 * 24 * HOUR)
+
+
+def _label_key(labelnames, labels: dict) -> tuple:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {sorted(labels)}")
+    return tuple((name, str(labels[name])) for name in labelnames)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.name, _label_key(self.labelnames, labels), amount)
+
+    def inc_many(self, amounts) -> None:
+        """Apply ``[(labels, amount)]`` with one write of the samples file."""
+        self.registry.add_many([
+            (self.name, _label_key(self.labelnames, labels), amount) for labels, amount in amounts
+        ])
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=()):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        # Every bucket is written, even with 0, so scrapes always list them all.
+        updates = [
+            (f"{self.name}_bucket", key + (("le", _format_value(bound)),), int(value <= bound))
+            for bound in self.buckets
+        ]
+        updates.append((f"{self.name}_sum", key, value))
+        updates.append((f"{self.name}_count", key, 1))
+        self.registry.add_many(updates)
+
+
+class Gauge(Metric):
+    """A gauge whose samples are computed by ``collect`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, registry, name, documentation, labelnames=(), collect=None):
+        super().__init__(registry, name, documentation, labelnames)
+        self.collect = collect
+
+
+class Registry:
+    def __init__(self, directory=None):
+        self._directory = directory
+        self.metrics = []
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.file_id = f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+    @property
+    def directory(self):
+        if self._directory is not None:
+            return self._directory
+        return getattr(settings, "METRICS_DIR", None)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=()):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, labelnames=(), collect=None):
+        return self._register(Gauge(self, name, documentation, labelnames, collect))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add(self, name, key, amount):
+        self.add_many([(name, key, amount)])
+
+    def add_many(self, updates):
+        with self.lock:
+            for name, key, amount in updates:
+                self.samples[(name, key)] = self.samples.get((name, key), 0) + amount
+            self._write()
+
+    def _path(self):
+        return os.path.join(self.directory, f"support_{self.file_id}.json")
+
+    def _write(self):
+        """Persist this process's samples so other workers can aggregate them."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path()
+        partial = f"{path}.tmp"
+        with open(partial, "w") as handle:
+            json.dump([[name, key, value] for (name, key), value in self.samples.items()], handle)
+        os.replace(partial, path)
+
+    def collected_samples(self) -> dict:
+        """Counter and histogram samples, summed over every process."""
+        if not self.directory or not os.path.isdir(self.directory):
+            with self.lock:
+                return dict(self.samples)
+        totals = {}
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith("support_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as handle:
+                    rows = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            for name, key, value in rows:
+                key = tuple(tuple(pair) for pair in key)
+                totals[(name, key)] = totals.get((name, key), 0) + value
+        return totals
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}
+            if self.directory and os.path.exists(self._path()):
+                os.remove(self._path())
+
+    def exposition(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        samples = self.collected_samples()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if isinstance(metric, Gauge):
+                rows = sorted(
+                    (metric.name, _label_key(metric.labelnames, labels), value)
+                    for labels, value in metric.collect()
+                )
+            else:
+                rows = sorted(
+                    (
+                        (name, key, value)
+                        for (name, key), value in samples.items()
+                        if name == metric.name or name.startswith(f"{metric.name}_")
+                    ),
+                    key=_sample_order,
+                )
+            for name, key, value in rows:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _sample_order(row):
+    """Group samples by label set, with histogram buckets in ``le`` order."""
+    name, key, _value = row
+    labels = tuple(pair for pair in key if pair[0] != "le")
+    le = dict(key).get("le")
+    return (labels, name, float(le.replace("+Inf", "inf")) if le else 0)
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def queue_depth():
+    """Open and in-progress ticket counts, from the counters table."""
+    rows = dict(
+        TicketCounter.objects.filter(status__in=ACTIVE_STATUSES)
+        .values_list("status")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    return [({"status": status}, rows.get(status, 0)) for status in ACTIVE_STATUSES]
+
+
+def unassigned_backlog():
+    total = TicketCounter.objects.filter(
+        status__in=ACTIVE_STATUSES, assigned=False
+    ).aggregate(total=Sum("count"))["total"]
+    return [({}, total or 0)]
+
+
+REGISTRY = Registry()
+
+TICKETS_CREATED = REGISTRY.counter(
+    "helpdesk_tickets_created_total",
+    "Tickets created, by category and urgency.",
+    ["category", "urgency"],
+)
+TIME_TO_RESOLVE = REGISTRY.histogram(
+    "helpdesk_ticket_time_to_resolve_seconds",
+    "Time from ticket creation to its status change to Resolved.",
+    ["category"],
+    buckets=RESOLVE_BUCKETS,
+)
+REGISTRY.gauge(
+    "helpdesk_ticket_queue_depth",
+    "Tickets waiting on IT, by status.",
+    ["status"],
+    collect=queue_depth,
+)
+REGISTRY.gauge(
+    "helpdesk_unassigned_backlog",
+    "Open or in-progress tickets with nobody assigned.",
+    collect=unassigned_backlog,
+)
+
+
+def record_created_tickets(tickets) -> None:
+    """Count new tickets once their transaction commits, one update per batch."""
+    totals = {}
+    for ticket in tickets:
+        key = (ticket.category, ticket.urgency)
+        totals[key] = totals.get(key, 0) + 1
+    amounts = [({"category": category, "urgency": urgency}, count) for (category, urgency), count in totals.items()]
+    if amounts:
+        transaction.on_commit(lambda: TICKETS_CREATED.inc_many(amounts))
+
+
+def record_status_events(events) -> None:
+    """Observe time-to-resolve for status events that resolve a ticket."""
+    for event in events:
+        if event.event_type != "status" or event.new_value != "resolved":
+            continue
+        ticket = event.ticket
+        seconds = (event.created_at - ticket.created_at).total_seconds()
+        TIME_TO_RESOLVE.observe(max(seconds, 0), category=ticket.category)
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Ticket = apps.get_model("support", "Ticket")
+    TicketCounter = apps.get_model("support", "TicketCounter")
+    rows = (
+        Ticket.objects.order_by()
+        .values("employee_id", "status", "category", "urgency", "assigned_to_id")
+        .annotate(count=Count("id"))
+    )
+    counts = {}
+    for row in rows:
+        key = (
+            row["employee_id"],
+            row["status"],
+            row["category"],
+            row["urgency"],
+            row["assigned_to_id"] is not None,
+        )
+        counts[key] = counts.get(key, 0) + row["count"]
+    TicketCounter.objects.bulk_create(
+        TicketCounter(
+            employee_id=employee_id,
+            status=status,
+            category=category,
+            urgency=urgency,
+            assigned=assigned,
+            count=count,
+        )
+        for (employee_id, status, category, urgency, assigned), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0003_ticket_customer_alternate_phone_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=20)),
+                ('category', models.CharField(choices=[('hardware', 'Hardware'), ('software', 'Software'), ('network', 'Network'), ('other', 'Other')], max_length=20)),
+                ('urgency', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('assigned', models.BooleanField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('employee', 'status', 'category', 'urgency', 'assigned'), name='unique_ticket_counter_key')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS support_ticket_fts USING fts5("
+        "title, description, employee, customer, comments, resolution_notes)"
+    )
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS support_asset_fts USING fts5("
+        "device_type, brand, serial_number)"
+    )
+    schema_editor.execute(
+        "INSERT INTO support_ticket_fts "
+        "(rowid, title, description, employee, customer, comments, resolution_notes) "
+        "SELECT t.id, t.title, t.description, u.username, "
+        "COALESCE(t.customer_name, '') || ' ' || COALESCE(t.customer_email, '') "
+        "|| ' ' || COALESCE(t.customer_phone, ''), "
+        "(SELECT group_concat(c.comment, char(10)) FROM support_ticketcomment c "
+        "WHERE c.ticket_id = t.id), "
+        "t.resolution_notes "
+        "FROM support_ticket t JOIN auth_user u ON u.id = t.employee_id"
+    )
+    schema_editor.execute(
+        "INSERT INTO support_asset_fts (rowid, device_type, brand, serial_number) "
+        "SELECT id, device_type, brand, serial_number FROM support_asset"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS support_ticket_fts")
+    schema_editor.execute("DROP TABLE IF EXISTS support_asset_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0005_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0008_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254)),
+                ('kind', models.CharField(choices=[('created', 'Ticket created'), ('comment', 'New comment'), ('status', 'Status changed'), ('assigned', 'Ticket assigned')], max_length=20)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='support.ticket')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sent_at', 'recipient', 'created_at'], name='notification_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0009_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='screenshot_preview',
+            field=models.FileField(blank=True, editable=False, upload_to='ticket_attachments/previews/'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='screenshot_thumbnail',
+            field=models.FileField(blank=True, editable=False, upload_to='ticket_attachments/thumbnails/'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0011_ticket_sla'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('status', 'Status changed'), ('assigned', 'Reassigned'), ('urgency', 'Urgency changed')], max_length=20)),
+                ('old_value', models.CharField(blank=True, max_length=50)),
+                ('new_value', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='support.ticket')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['ticket', 'created_at'], name='event_ticket_created_idx'), models.Index(fields=['event_type', 'created_at'], name='event_type_created_idx')],
+            },
+        ),
+    ]
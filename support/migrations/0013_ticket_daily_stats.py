@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0012_ticket_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(choices=[('hardware', 'Hardware'), ('software', 'Software'), ('network', 'Network'), ('other', 'Other')], max_length=20)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('resolved', models.PositiveIntegerField(default=0)),
+                ('backlog', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['day', 'category'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('resolved_at__isnull', False)), fields=['resolved_at'], name='ticket_resolved_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketdailystats',
+            constraint=models.UniqueConstraint(fields=('day', 'category'), name='unique_daily_stats_day_category'),
+        ),
+    ]
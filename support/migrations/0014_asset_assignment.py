@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:05
+
+from datetime import datetime, time
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_current_intervals(apps, schema_editor):
+    """Existing assets get one open interval from their purchase date; earlier changes are unknown."""
+    Asset = apps.get_model("support", "Asset")
+    AssetAssignment = apps.get_model("support", "AssetAssignment")
+    rows = Asset.objects.order_by("pk").values_list("pk", "assigned_to_id", "status", "purchase_date")
+    AssetAssignment.objects.bulk_create(
+        (
+            AssetAssignment(
+                asset_id=pk,
+                assigned_to_id=assigned_to_id,
+                status=status,
+                valid_from=django.utils.timezone.make_aware(datetime.combine(purchased, time.min)),
+            )
+            for pk, assigned_to_id, status, purchased in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0013_ticket_daily_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('in_use', 'In Use'), ('available', 'Available'), ('under_repair', 'Under Repair')], max_length=20)),
+                ('valid_from', models.DateTimeField(default=django.utils.timezone.now)),
+                ('valid_to', models.DateTimeField(blank=True, null=True)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='support.asset')),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asset_history', to=settings.AUTH_USER_MODEL)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['asset', 'valid_from'],
+                'indexes': [models.Index(fields=['asset', 'valid_from'], name='asset_history_asset_idx'), models.Index(fields=['valid_from', 'valid_to'], name='asset_history_interval_idx'), models.Index(fields=['status', 'valid_from', 'valid_to'], name='asset_history_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('valid_to', None)), fields=('asset',), name='unique_open_asset_assignment')],
+            },
+        ),
+        migrations.RunPython(open_current_intervals, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Ticket(models.Model):
@@ -30,7 +31,8 @@ class Ticket(models.Model):
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="open"
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: the SLA due dates are computed from it before saving.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     employee = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="tickets"
     )
@@ -50,6 +52,12 @@ class Ticket(models.Model):
     screenshot = models.FileField(
         upload_to="ticket_attachments/", null=True, blank=True
     )
+    screenshot_preview = models.FileField(
+        upload_to="ticket_attachments/previews/", blank=True, editable=False
+    )
+    screenshot_thumbnail = models.FileField(
+        upload_to="ticket_attachments/thumbnails/", blank=True, editable=False
+    )
     resolution_notes = models.TextField(blank=True)
     assigned_to = models.ForeignKey(
         User,
@@ -58,13 +66,52 @@ class Ticket(models.Model):
         blank=True,
         related_name="assigned_tickets",
     )
+    # SLA deadlines and milestones, kept current by support.sla
+    response_due_at = models.DateTimeField(null=True, blank=True, editable=False)
+    resolution_due_at = models.DateTimeField(null=True, blank=True, editable=False)
+    first_response_at = models.DateTimeField(null=True, blank=True, editable=False)
+    resolved_at = models.DateTimeField(null=True, blank=True, editable=False)
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"], name="ticket_created_idx"),
+            models.Index(fields=["status", "created_at"], name="ticket_status_created_idx"),
+            models.Index(fields=["category", "created_at"], name="ticket_category_created_idx"),
+            models.Index(fields=["urgency", "created_at"], name="ticket_urgency_created_idx"),
+            models.Index(
+                fields=["status", "category", "urgency", "created_at"],
+                name="ticket_filters_created_idx",
+            ),
+            models.Index(fields=["employee", "created_at"], name="ticket_employee_created_idx"),
+            # Only unmet deadlines are indexed, which keeps SLA breach scans short.
+            models.Index(
+                fields=["response_due_at"],
+                condition=models.Q(first_response_at__isnull=True),
+                name="ticket_response_due_idx",
+            ),
+            models.Index(
+                fields=["resolution_due_at"],
+                condition=models.Q(resolved_at__isnull=True),
+                name="ticket_resolution_due_idx",
+            ),
+            # Daily rollups count the tickets resolved in a time range.
+            models.Index(
+                fields=["resolved_at"],
+                condition=models.Q(resolved_at__isnull=False),
+                name="ticket_resolved_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} ({self.get_status_display()})"
 
+    def save(self, *args, **kwargs):
+        # Keep the save and the counter signal handlers in one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def get_urgency_color(self):
         """Return Bootstrap color class for urgency."""
         colors = {
@@ -85,6 +132,51 @@ class Ticket(models.Model):
         return colors.get(self.status, "secondary")
 
 
+class TicketCounter(models.Model):
+    """Denormalized ticket count per (employee, status, category, urgency, assigned)."""
+    employee = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="ticket_counters"
+    )
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES)
+    category = models.CharField(max_length=20, choices=Ticket.CATEGORY_CHOICES)
+    urgency = models.CharField(max_length=10, choices=Ticket.URGENCY_CHOICES)
+    assigned = models.BooleanField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "status", "category", "urgency", "assigned"],
+                name="unique_ticket_counter_key",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.employee_id}/{self.status}/{self.category}/"
+            f"{self.urgency}/{'assigned' if self.assigned else 'unassigned'}: {self.count}"
+        )
+
+
+class TicketDailyStats(models.Model):
+    """Tickets opened and resolved per day and category; see ``support.reports``."""
+    day = models.DateField()
+    category = models.CharField(max_length=20, choices=Ticket.CATEGORY_CHOICES)
+    created = models.PositiveIntegerField(default=0)
+    resolved = models.PositiveIntegerField(default=0)
+    # Tickets not yet resolved at the end of the day.
+    backlog = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["day", "category"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "category"], name="unique_daily_stats_day_category")
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category}: +{self.created} -{self.resolved} ({self.backlog} open)"
+
+
 class TicketComment(models.Model):
     """Comments/updates on tickets for activity tracking."""
     ticket = models.ForeignKey(
@@ -92,15 +184,65 @@ class TicketComment(models.Model):
     )
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     comment = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: comments written by a background task keep the time
+    # of the change they describe.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["ticket", "created_at"], name="comment_ticket_created_idx"),
+            models.Index(fields=["created_at"], name="comment_created_idx"),
+        ]
 
     def __str__(self):
         return f"Comment on Ticket #{self.ticket.id} by {self.user.username}"
 
 
+class TicketEvent(models.Model):
+    """
+    Append-only log of ticket changes, one row per changed value.
+
+    Values are stored raw: status and urgency choice values, and assignee
+    user ids (empty for unassigned).
+    """
+    TYPE_CHOICES = [
+        ("created", "Created"),
+        ("status", "Status changed"),
+        ("assigned", "Reassigned"),
+        ("urgency", "Urgency changed"),
+    ]
+
+    ticket = models.ForeignKey(
+        Ticket, on_delete=models.CASCADE, related_name="events"
+    )
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    event_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    old_value = models.CharField(max_length=50, blank=True)
+    new_value = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(fields=["ticket", "created_at"], name="event_ticket_created_idx"),
+            models.Index(fields=["event_type", "created_at"], name="event_type_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} on Ticket #{self.ticket_id}: {self.old_value} -> {self.new_value}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ticket events are append-only and cannot be changed.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Ticket events are append-only and cannot be deleted.")
+
+
 class Asset(models.Model):
     STATUS_CHOICES = [
         ("in_use", "In Use"),
@@ -124,6 +266,13 @@ class Asset(models.Model):
 
     class Meta:
         ordering = ["device_type", "brand"]
+        indexes = [
+            models.Index(fields=["device_type", "brand"], name="asset_type_brand_idx"),
+            models.Index(
+                fields=["status", "device_type", "brand"], name="asset_status_type_brand_idx"
+            ),
+            models.Index(fields=["warranty_expiry"], name="asset_warranty_expiry_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.device_type} - {self.brand} ({self.serial_number})"
@@ -139,3 +288,114 @@ class Asset(models.Model):
         delta = self.warranty_expiry - timezone.now().date()
         return delta.days
 
+
+class AssetAssignment(models.Model):
+    """
+    An asset's assignee and status over ``[valid_from, valid_to)``.
+
+    Every change to either closes the open interval and starts a new one;
+    ``valid_to`` is null for the current one. See ``support.asset_history``.
+    """
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, related_name="history")
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="asset_history"
+    )
+    status = models.CharField(max_length=20, choices=Asset.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    valid_from = models.DateTimeField(default=timezone.now)
+    valid_to = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["asset", "valid_from"]
+        indexes = [
+            models.Index(fields=["asset", "valid_from"], name="asset_history_asset_idx"),
+            models.Index(fields=["valid_from", "valid_to"], name="asset_history_interval_idx"),
+            models.Index(
+                fields=["status", "valid_from", "valid_to"], name="asset_history_status_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["asset"], condition=models.Q(valid_to=None), name="unique_open_asset_assignment"
+            )
+        ]
+
+    def __str__(self):
+        until = f"{self.valid_to:%Y-%m-%d}" if self.valid_to else "now"
+        return f"Asset #{self.asset_id} {self.status} from {self.valid_from:%Y-%m-%d} to {until}"
+
+
+class ExportWatermark(models.Model):
+    """Position of the last row written by an incremental bulk export feed."""
+    feed = models.CharField(max_length=100)
+    dataset = models.CharField(max_length=20)
+    last_created_at = models.DateTimeField(null=True, blank=True)
+    last_id = models.BigIntegerField(null=True, blank=True)
+    exported_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["feed", "dataset"], name="unique_export_watermark")
+        ]
+
+    def __str__(self):
+        return f"{self.feed}/{self.dataset} after #{self.last_id}"
+
+
+class Task(models.Model):
+    """A background job for ``manage.py run_worker``; see ``support.taskqueue``."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="task_status_run_after_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class Notification(models.Model):
+    """A ticket event waiting to go out in its recipient's next digest email."""
+    KIND_CHOICES = [
+        ("created", "Ticket created"),
+        ("comment", "New comment"),
+        ("status", "Status changed"),
+        ("assigned", "Ticket assigned"),
+    ]
+
+    recipient = models.EmailField()
+    ticket = models.ForeignKey(
+        Ticket, on_delete=models.CASCADE, related_name="notifications"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    message = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["sent_at", "recipient", "created_at"], name="notification_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.recipient} on Ticket #{self.ticket_id}"
@@ -0,0 +1,151 @@
+"""
+Email notifications for ticket customers and assignees, sent as digests.
+
+Ticket and comment signals only store one ``Notification`` row per
+recipient and make sure a ``send_notifications`` task is queued, so a
+request never talks to the mail server. The worker sends each recipient a
+single email covering all their pending events once the oldest of them is
+``settings.NOTIFICATION_DIGEST_WINDOW`` seconds old, and sends every email
+of a run through one connection. Each digest's rows are marked sent as soon
+as it has gone out, so a run that fails part-way is retried without
+mailing anyone twice.
+"""
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Min
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification, Task, Ticket
+from .taskqueue import enqueue
+
+SEND_NOTIFICATIONS = "send_notifications"
+STATUS_LABELS = dict(Ticket.STATUS_CHOICES)
+COMMENT_PREVIEW = 500
+
+
+def digest_window() -> int:
+    return getattr(settings, "NOTIFICATION_DIGEST_WINDOW", 300)
+
+
+def batch_size() -> int:
+    return getattr(settings, "NOTIFICATION_BATCH_SIZE", 100)
+
+
+def schedule_dispatch(delay=None) -> None:
+    """Queue a send task unless one is already waiting."""
+    if not Task.objects.filter(name=SEND_NOTIFICATIONS, status="queued").exists():
+        enqueue(SEND_NOTIFICATIONS, delay=digest_window() if delay is None else delay)
+
+
+def notify(ticket: Ticket, kind: str, message: str, recipients) -> int:
+    rows = [
+        Notification(recipient=email, ticket=ticket, kind=kind, message=message)
+        for email in sorted(set(recipients))
+        if email
+    ]
+    if rows:
+        Notification.objects.bulk_create(rows)
+        schedule_dispatch()
+    return len(rows)
+
+
+def _recipients(ticket: Ticket, customer=True, assignee=True, exclude=None) -> set:
+    emails = set()
+    if customer and ticket.customer_email:
+        emails.add(ticket.customer_email.lower())
+    if assignee and ticket.assigned_to_id and ticket.assigned_to.email:
+        emails.add(ticket.assigned_to.email.lower())
+    emails.discard((exclude or "").lower())
+    return emails
+
+
+def ticket_created(ticket: Ticket) -> int:
+    """Tell the customer and assignee, but not the employee who raised it."""
+    author = ticket.employee.email if ticket.employee_id else None
+    return notify(
+        ticket, "created", f'Ticket #{ticket.pk} "{ticket.title}" was opened.',
+        _recipients(ticket, exclude=author),
+    )
+
+
+def comment_added(comment) -> int:
+    ticket = comment.ticket
+    name = comment.user.get_full_name() or comment.user.username
+    text = comment.comment[:COMMENT_PREVIEW]
+    return notify(
+        ticket, "comment", f"{name} wrote: {text}", _recipients(ticket, exclude=comment.user.email)
+    )
+
+
+def events_recorded(events) -> int:
+    """Notify about status changes, and new assignees about their tickets."""
+    queued = 0
+    for event in events:
+        ticket = event.ticket
+        actor = event.actor.email if event.actor else None
+        if event.event_type == "status":
+            queued += notify(
+                ticket, "status", f"Status changed to {STATUS_LABELS.get(event.new_value, event.new_value)}.",
+                _recipients(ticket, exclude=actor),
+            )
+        elif event.event_type == "assigned" and event.new_value:
+            queued += notify(
+                ticket, "assigned", f'Ticket #{ticket.pk} "{ticket.title}" was assigned to you.',
+                _recipients(ticket, customer=False, exclude=actor),
+            )
+    return queued
+
+
+def digest_message(recipient: str, notifications: list) -> EmailMessage:
+    tickets = []
+    for _ticket_id, events in groupby(notifications, key=lambda row: row.ticket_id):
+        events = list(events)
+        tickets.append({"ticket": events[0].ticket, "events": events})
+    if len(tickets) == 1:
+        ticket = tickets[0]["ticket"]
+        subject = f"[Helpdesk] Ticket #{ticket.pk}: {ticket.title}"
+    else:
+        subject = f"[Helpdesk] Updates on {len(tickets)} tickets"
+    body = render_to_string("support/email/notification_digest.txt", {"tickets": tickets})
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient])
+
+
+def send_due_digests(now=None) -> int:
+    """
+    Email every recipient whose oldest pending event is past the window.
+
+    Handles up to ``NOTIFICATION_BATCH_SIZE`` recipients per call, then
+    queues the next run for whatever is left. Returns the emails sent.
+    """
+    now = now or timezone.now()
+    pending = Notification.objects.filter(sent_at=None)
+    due = list(
+        pending.values("recipient")
+        .annotate(first=Min("created_at"))
+        .filter(first__lte=now - timedelta(seconds=digest_window()))
+        .order_by("first", "recipient")
+        .values_list("recipient", flat=True)[:batch_size()]
+    )
+    sent = 0
+    if due:
+        rows = list(
+            pending.filter(recipient__in=due)
+            .select_related("ticket")
+            .order_by("recipient", "ticket_id", "created_at", "id")
+        )
+        # One connection (one SMTP login) for the whole batch.
+        with get_connection() as connection:
+            for recipient, group in groupby(rows, key=lambda row: row.recipient):
+                group = list(group)
+                sent += connection.send_messages([digest_message(recipient, group)]) or 0
+                Notification.objects.filter(pk__in=[row.pk for row in group]).update(sent_at=now)
+
+    oldest = pending.aggregate(oldest=Min("created_at"))["oldest"]
+    if oldest is not None:
+        due_in = (oldest + timedelta(seconds=digest_window()) - now).total_seconds()
+        schedule_dispatch(delay=max(due_in, 0))
+    return sent
@@ -0,0 +1,260 @@
+"""
+Keyset (cursor) pagination for the ticket and asset listings.
+
+``Paginator`` runs ``COUNT(*)`` plus an ``OFFSET`` query, so deep pages get
+slower the further you go. ``CursorPaginator`` instead seeks past the last
+row shown using the listing's ordering columns, which the composite indexes
+on ``Ticket`` and ``Asset`` serve directly. Which paginator a view uses is
+configured per view through ``settings.LISTING_PAGINATION``.
+"""
+import asyncio
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+TICKET_CURSOR_ORDERING = ["-created_at", "-id"]
+ASSET_CURSOR_ORDERING = ["device_type", "brand", "id"]
+
+ESTIMATE_LIMIT = 1000
+
+
+def listing_pagination(view_name: str) -> dict:
+    """Return the pagination ``mode`` and ``count`` settings for a view; unlisted views page exactly."""
+    config = {"mode": "page", "count": "exact"}
+    config.update(getattr(settings, "LISTING_PAGINATION", {}).get(view_name, {}))
+    return config
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keep full microsecond precision, which ``DjangoJSONEncoder`` drops."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, cls=CursorEncoder).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor string, returning None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+class CursorPaginator:
+    """Paginate a queryset by seeking on its ordering columns."""
+
+    def __init__(self, object_list, per_page, ordering, count_mode="exact"):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = [
+            (name.lstrip("-"), name.startswith("-")) for name in ordering
+        ]
+        self.count_mode = count_mode
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self.count_mode == "estimated" and self.count >= ESTIMATE_LIMIT
+
+    def _count_queryset(self):
+        queryset = self.object_list.order_by()
+        if self.count_mode == "estimated":
+            queryset = queryset.values("pk")[:ESTIMATE_LIMIT]
+        return queryset
+
+    @property
+    def count(self) -> int:
+        """Exact row count, or a count capped at ``ESTIMATE_LIMIT``."""
+        if not hasattr(self, "_count"):
+            self._count = self._count_queryset().count()
+        return self._count
+
+    async def acount(self) -> int:
+        if not hasattr(self, "_count"):
+            self._count = await self._count_queryset().acount()
+        return self._count
+
+    def _parse(self, cursor):
+        values = decode_cursor(cursor) if cursor else None
+        if values is None or len(values) != len(self.ordering):
+            return None
+        opts = self.object_list.model._meta
+        try:
+            return [
+                opts.get_field(name).to_python(value)
+                for (name, _descending), value in zip(self.ordering, values)
+            ]
+        except ValidationError:
+            return None
+
+    def _seek(self, values, backwards):
+        """Q matching rows strictly after ``values`` in the listing order."""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != backwards else "gt"
+            step = Q(**{f"{name}__{lookup}": values[index]})
+            for prior, (prior_name, _descending) in enumerate(self.ordering[:index]):
+                step &= Q(**{prior_name: values[prior]})
+            condition |= step
+        return condition
+
+    def _order_by(self, backwards):
+        return [
+            f"-{name}" if descending != backwards else name
+            for name, descending in self.ordering
+        ]
+
+    def _cursor_for(self, obj) -> str:
+        return encode_cursor([getattr(obj, name) for name, _descending in self.ordering])
+
+    def _page_query(self, after, before):
+        """Return the rows query for a page, its cursor values and direction."""
+        after_values = self._parse(after)
+        before_values = None if after_values else self._parse(before)
+        backwards = before_values is not None
+        values = before_values if backwards else after_values
+
+        queryset = self.object_list.order_by(*self._order_by(backwards))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        return queryset[:self.per_page + 1], values, backwards
+
+    def _make_page(self, rows, values, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            return CursorPage(self, rows, has_next=True, has_previous=has_more)
+        return CursorPage(self, rows, has_next=has_more, has_previous=values is not None)
+
+    def get_page(self, after=None, before=None):
+        """Return the page after or before a cursor; the first page otherwise."""
+        queryset, values, backwards = self._page_query(after, before)
+        return self._make_page(list(queryset), values, backwards)
+
+    async def aget_page(self, after=None, before=None):
+        queryset, values, backwards = self._page_query(after, before)
+        return self._make_page([row async for row in queryset], values, backwards)
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.base_query = ""
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        return self.paginator._cursor_for(self.object_list[-1]) if self.has_next() else ""
+
+    def previous_cursor(self):
+        return self.paginator._cursor_for(self.object_list[0]) if self.has_previous() else ""
+
+    def _query(self, key, cursor):
+        prefix = f"{self.base_query}&" if self.base_query else ""
+        return f"{prefix}{key}={cursor}"
+
+    def next_query(self):
+        return self._query("after", self.next_cursor())
+
+    def previous_query(self):
+        return self._query("before", self.previous_cursor())
+
+
+def paginate(request, queryset, view_name, per_page, cursor_ordering):
+    """
+    Paginate a listing the way ``settings.LISTING_PAGINATION`` says.
+
+    Returns a ``django.core.paginator.Page`` in ``page`` mode and a
+    ``CursorPage`` in ``cursor`` mode. Ranked search results keep page mode,
+    since their relevance order has no stable keyset.
+    """
+    config = listing_pagination(view_name)
+    if config["mode"] != "cursor" or "search_rank" in queryset.query.annotations:
+        return Paginator(queryset, per_page).get_page(request.GET.get("page"))
+
+    paginator = CursorPaginator(queryset, per_page, cursor_ordering, config["count"])
+    page = paginator.get_page(request.GET.get("after"), request.GET.get("before"))
+    page.base_query = _base_query(request)
+    return page
+
+
+def _base_query(request) -> str:
+    params = request.GET.copy()
+    for key in ("page", "after", "before"):
+        params.pop(key, None)
+    return params.urlencode()
+
+
+def _page_number(request) -> int:
+    try:
+        return max(int(request.GET.get("page", 1)), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+async def apaginate(request, queryset, view_name, per_page, cursor_ordering):
+    """
+    ``paginate`` for async views, with the rows loaded before rendering.
+
+    The count and the page's rows are fetched concurrently; in page mode the
+    rows are fetched again only if the requested page turns out to be past
+    the end.
+    """
+    config = listing_pagination(view_name)
+    if config["mode"] != "cursor" or "search_rank" in queryset.query.annotations:
+        paginator = Paginator(queryset, per_page)
+        number = _page_number(request)
+        start = (number - 1) * paginator.per_page
+        rows = queryset[start:start + paginator.per_page]
+        paginator.count, object_list = await asyncio.gather(
+            queryset.acount(), _alist(rows)
+        )
+        page = paginator.get_page(number)
+        page.object_list = object_list if page.number == number else await _alist(page.object_list)
+        return page
+
+    paginator = CursorPaginator(queryset, per_page, cursor_ordering, config["count"])
+    page, _count = await asyncio.gather(
+        paginator.aget_page(request.GET.get("after"), request.GET.get("before")),
+        paginator.acount(),
+    )
+    page.base_query = _base_query(request)
+    return page
+
+
+async def _alist(queryset) -> list:
+    return [row async for row in queryset]
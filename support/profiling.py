@@ -0,0 +1,205 @@
+"""
+Per-request profiling: query count, SQL time, template render time.
+
+``RequestProfilingMiddleware`` profiles a sample of requests, reports each
+one in a ``Server-Timing`` header and a DEBUG-level JSON log line, and feeds
+a rolling in-process window per view that ``/admin/metrics/`` summarises.
+Template time is measured by the ``ProfiledDjangoTemplates`` backend.
+
+Queries are timed by ``profile_query``, which every connection gets when it
+opens. It looks the request's profile up in a context variable, so queries
+run by async views in ``sync_to_async`` threads are counted too.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SIZE = 1000
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_current = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+        self.total_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+    def finish(self, request):
+        self.total_time = time.perf_counter() - self.started
+        match = getattr(request, "resolver_match", None)
+        self.view = match.view_name if match else "unresolved"
+
+    def as_dict(self) -> dict:
+        return {
+            "view": self.view,
+            "queries": self.queries,
+            "sql_ms": round(self.sql_time * 1000, 2),
+            "render_ms": round(self.render_time * 1000, 2),
+            "total_ms": round(self.total_time * 1000, 2),
+        }
+
+    def server_timing(self) -> str:
+        data = self.as_dict()
+        return (
+            f'db;dur={data["sql_ms"]};desc="{self.queries} queries", '
+            f'render;dur={data["render_ms"]}, '
+            f'total;dur={data["total_ms"]}'
+        )
+
+
+def profile_query(execute, sql, params, many, context):
+    """``execute_wrapper`` on every connection; times queries of a profiled request."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def install_query_profiler(connection) -> None:
+    if profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_query)
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None:
+            return super().render(context, request)
+        # Templates rendered from inside another render are already timed.
+        profile.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.render_depth -= 1
+            if not profile.render_depth:
+                profile.render_time += time.perf_counter() - started
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each top-level render."""
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
+
+
+class ViewWindow:
+    """The most recent ``WINDOW_SIZE`` profiles of one view."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW_SIZE)
+        self.requests = 0
+
+    def add(self, profile: RequestProfile):
+        self.samples.append(
+            (profile.total_time * 1000, profile.sql_time * 1000,
+             profile.render_time * 1000, profile.queries)
+        )
+        self.requests += 1
+
+    def summary(self) -> dict:
+        totals = sorted(sample[0] for sample in self.samples)
+        count = len(totals)
+        buckets = []
+        for bound in BUCKETS_MS:
+            buckets.append((f"≤{bound} ms", sum(1 for value in totals if value <= bound)))
+        buckets.append(("all", count))
+        return {
+            "requests": self.requests,
+            "window": count,
+            "p50_ms": _percentile(totals, 50),
+            "p95_ms": _percentile(totals, 95),
+            "max_ms": round(totals[-1], 2) if totals else 0,
+            "avg_sql_ms": _average(sample[1] for sample in self.samples),
+            "avg_render_ms": _average(sample[2] for sample in self.samples),
+            "avg_queries": _average(sample[3] for sample in self.samples),
+            "buckets": buckets,
+        }
+
+
+def _percentile(ordered: list, percent: int) -> float:
+    if not ordered:
+        return 0
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return round(ordered[index], 2)
+
+
+def _average(values) -> float:
+    values = list(values)
+    return round(sum(values) / len(values), 2) if values else 0
+
+
+_windows = {}
+_windows_lock = threading.Lock()
+
+
+def record_profile(profile: RequestProfile) -> None:
+    with _windows_lock:
+        _windows.setdefault(profile.view, ViewWindow()).add(profile)
+
+
+def view_metrics() -> list:
+    """Return ``(view_name, summary)`` pairs for this process, slowest p95 first."""
+    with _windows_lock:
+        summaries = [(view, window.summary()) for view, window in _windows.items()]
+    return sorted(summaries, key=lambda item: item[1]["p95_ms"], reverse=True)
+
+
+def reset_view_metrics() -> None:
+    with _windows_lock:
+        _windows.clear()
+
+
+def sample_rate() -> float:
+    return getattr(settings, "REQUEST_PROFILING_SAMPLE_RATE", 0.0)
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        profile.finish(request)
+        record_profile(profile)
+        response["Server-Timing"] = profile.server_timing()
+        data = profile.as_dict()
+        logger.debug(json.dumps(data, sort_keys=True), extra={"profile": data})
+        return response
@@ -0,0 +1,148 @@
+"""
+Ticket volume, resolution and backlog trends from daily rollups.
+
+``refresh_rollups`` stores one ``TicketDailyStats`` row per day and
+category with the tickets opened and resolved that day, counted on the
+indexed ``created_at`` and ``resolved_at``, and the backlog left at the end
+of it. A refresh only recomputes from the newest stored day onwards, so
+the hourly run in the task worker reads a day or two of tickets.
+``ticket_trends`` feeds the dashboard charts from these rows: a year is at
+most a few thousand rows read through the ``(day, category)`` index, and
+weeks and months are summed in Python.
+
+Rollups describe tickets as they are now. Reopening a ticket clears its
+``resolved_at``, which moves counts of days that are already stored;
+``refresh_rollups(rebuild=True)`` recomputes everything.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Task, Ticket, TicketDailyStats
+from .taskqueue import enqueue
+
+REFRESH_ROLLUPS = "refresh_rollups"
+BUCKETS = ("day", "week", "month")
+CATEGORIES = [value for value, _label in Ticket.CATEGORY_CHOICES]
+MAX_DAYS = 730
+
+
+def schedule_refresh() -> None:
+    """Queue a rollup refresh unless one is already waiting."""
+    if not Task.objects.filter(name=REFRESH_ROLLUPS, status="queued").exists():
+        enqueue(REFRESH_ROLLUPS)
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _daily_counts(field: str, start, end) -> dict:
+    """``{(day, category): tickets}`` for tickets whose ``field`` is in ``[start, end)``."""
+    rows = (
+        Ticket.objects.filter(**{f"{field}__gte": start, f"{field}__lt": end})
+        .annotate(day=TruncDate(field))
+        .values("day", "category")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {(row["day"], row["category"]): row["count"] for row in rows}
+
+
+def _backlog_at(start) -> dict:
+    """Tickets per category opened before ``start`` and not resolved by then."""
+    rows = (
+        Ticket.objects.filter(created_at__lt=start)
+        .filter(Q(resolved_at=None) | Q(resolved_at__gte=start))
+        .values("category")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {row["category"]: row["count"] for row in rows}
+
+
+def refresh_rollups(since=None, today=None, rebuild=False) -> int:
+    """
+    Recompute the rollups from ``since`` to ``today``; returns the days written.
+
+    ``since`` defaults to the newest stored day, which was probably still
+    in progress when it was written, or to the first ticket's day. With
+    ``rebuild``, stored days are ignored, including the backlog of the day
+    before ``since``.
+    """
+    today = today or timezone.localdate()
+    if since is None:
+        latest = None if rebuild else TicketDailyStats.objects.aggregate(latest=Max("day"))["latest"]
+        if latest is None:
+            first = Ticket.objects.aggregate(first=Min("created_at"))["first"]
+            if first is None:
+                return 0
+            latest = timezone.localdate(first)
+        since = latest
+    if since > today:
+        return 0
+
+    start, end = _midnight(since), _midnight(today + timedelta(days=1))
+    # Carry the backlog over from the day before; count it only without one.
+    previous = TicketDailyStats.objects.filter(day=since - timedelta(days=1))
+    backlog = (not rebuild and dict(previous.values_list("category", "backlog"))) or _backlog_at(start)
+    backlog = {category: backlog.get(category, 0) for category in CATEGORIES}
+    opened = _daily_counts("created_at", start, end)
+    resolved = _daily_counts("resolved_at", start, end)
+
+    rows = []
+    day = since
+    while day <= today:
+        for category in CATEGORIES:
+            created = opened.get((day, category), 0)
+            done = resolved.get((day, category), 0)
+            backlog[category] = max(backlog[category] + created - done, 0)
+            rows.append(TicketDailyStats(
+                day=day, category=category, created=created, resolved=done, backlog=backlog[category],
+            ))
+        day += timedelta(days=1)
+    with transaction.atomic():
+        TicketDailyStats.objects.filter(day__gte=since).delete()
+        TicketDailyStats.objects.bulk_create(rows, batch_size=1000)
+    return (today - since).days + 1
+
+
+def _period(day, bucket: str):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def ticket_trends(bucket="day", days=365, category=None, today=None) -> dict:
+    """
+    Chart series for the last ``days`` days, one point per ``bucket``.
+
+    Opened and resolved tickets are summed over each period; the backlog
+    is the one at the end of the period's last stored day.
+    """
+    today = today or timezone.localdate()
+    rows = TicketDailyStats.objects.filter(day__gt=today - timedelta(days=days), day__lte=today)
+    if category:
+        rows = rows.filter(category=category)
+    periods = {}
+    for day, created, resolved, backlog in rows.order_by("day").values_list(
+        "day", "created", "resolved", "backlog"
+    ):
+        period = periods.setdefault(_period(day, bucket), {"created": 0, "resolved": 0})
+        period["created"] += created
+        period["resolved"] += resolved
+        if period.get("day") != day:
+            period["day"], period["backlog"] = day, 0
+        period["backlog"] += backlog
+    return {
+        "bucket": bucket,
+        "labels": [start.isoformat() for start in periods],
+        "created": [period["created"] for period in periods.values()],
+        "resolved": [period["resolved"] for period in periods.values()],
+        "backlog": [period["backlog"] for period in periods.values()],
+    }
@@ -0,0 +1,233 @@
+"""
+Full-text search over tickets and assets.
+
+On SQLite the text lives in FTS5 virtual tables kept in sync by the signal
+handlers in ``support.signals``. Other database backends fall back to
+portable ``icontains`` filters over the same fields, one per search term.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Asset, Ticket, TicketComment
+
+TICKET_FTS_TABLE = "support_ticket_fts"
+ASSET_FTS_TABLE = "support_asset_fts"
+
+CREATE_TICKET_FTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TICKET_FTS_TABLE} USING fts5("
+    "title, description, employee, customer, comments, resolution_notes)"
+)
+CREATE_ASSET_FTS = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {ASSET_FTS_TABLE} USING fts5("
+    "device_type, brand, serial_number)"
+)
+
+BATCH_SIZE = 1000
+
+TICKET_SEARCH_FIELDS = (
+    "title", "description", "employee__username", "customer_name",
+    "customer_email", "customer_phone", "resolution_notes",
+)
+ASSET_SEARCH_FIELDS = ("device_type", "brand", "serial_number")
+
+
+def search_enabled() -> bool:
+    """Whether the FTS5 index is available on the default database."""
+    return connection.vendor == "sqlite"
+
+
+def fts_query(text: str) -> str:
+    """Turn free user input into a safe FTS5 query of prefix terms."""
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ticket_document(ticket: Ticket, comments: list) -> tuple:
+    customer = " ".join(
+        value or ""
+        for value in (ticket.customer_name, ticket.customer_email, ticket.customer_phone)
+    )
+    return (
+        ticket.pk,
+        ticket.title,
+        ticket.description,
+        ticket.employee.username,
+        customer,
+        "\n".join(comments),
+        ticket.resolution_notes,
+    )
+
+
+def _asset_document(asset: Asset) -> tuple:
+    return (asset.pk, asset.device_type, asset.brand, asset.serial_number)
+
+
+def _batches(queryset):
+    """Yield lists of ``BATCH_SIZE`` instances in primary-key order."""
+    queryset = queryset.order_by("pk")
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def _insert_ticket_rows(cursor, rows: list) -> None:
+    cursor.executemany(
+        f"INSERT INTO {TICKET_FTS_TABLE} "
+        "(rowid, title, description, employee, customer, comments, resolution_notes) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        rows,
+    )
+
+
+def _insert_asset_rows(cursor, rows: list) -> None:
+    cursor.executemany(
+        f"INSERT INTO {ASSET_FTS_TABLE} (rowid, device_type, brand, serial_number) "
+        "VALUES (%s, %s, %s, %s)",
+        rows,
+    )
+
+
+def index_ticket(ticket: Ticket) -> None:
+    """(Re)index one ticket together with its comment text."""
+    if not search_enabled():
+        return
+    comments = list(
+        TicketComment.objects.filter(ticket_id=ticket.pk).values_list("comment", flat=True)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TICKET_FTS_TABLE} WHERE rowid = %s", [ticket.pk])
+        _insert_ticket_rows(cursor, [_ticket_document(ticket, comments)])
+
+
+def index_new_tickets(tickets: list) -> None:
+    """Index freshly bulk-created tickets, which have no comments yet."""
+    if not search_enabled() or not tickets:
+        return
+    with connection.cursor() as cursor:
+        _insert_ticket_rows(cursor, [_ticket_document(ticket, []) for ticket in tickets])
+
+
+def unindex_ticket(ticket_id) -> None:
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TICKET_FTS_TABLE} WHERE rowid = %s", [ticket_id])
+
+
+def index_asset(asset: Asset) -> None:
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {ASSET_FTS_TABLE} WHERE rowid = %s", [asset.pk])
+        _insert_asset_rows(cursor, [_asset_document(asset)])
+
+
+def index_new_assets(assets: list) -> None:
+    """Index freshly bulk-created assets."""
+    if not search_enabled() or not assets:
+        return
+    with connection.cursor() as cursor:
+        _insert_asset_rows(cursor, [_asset_document(asset) for asset in assets])
+
+
+def unindex_asset(asset_id) -> None:
+    if not search_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {ASSET_FTS_TABLE} WHERE rowid = %s", [asset_id])
+
+
+def rebuild_search_index() -> dict:
+    """
+    Recreate both FTS tables from scratch, in batches.
+
+    Runs in one transaction (SQLite DDL is transactional): searches keep
+    reading the old index until the new one commits, and a failed rebuild
+    leaves the old index in place.
+    """
+    if not search_enabled():
+        return {"tickets": 0, "assets": 0}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TICKET_FTS_TABLE}")
+        cursor.execute(f"DROP TABLE IF EXISTS {ASSET_FTS_TABLE}")
+        cursor.execute(CREATE_TICKET_FTS)
+        cursor.execute(CREATE_ASSET_FTS)
+
+        tickets = 0
+        for batch in _batches(Ticket.objects.select_related("employee")):
+            comments = {}
+            for ticket_id, text in (
+                TicketComment.objects.filter(ticket__in=batch)
+                .order_by("created_at")
+                .values_list("ticket_id", "comment")
+            ):
+                comments.setdefault(ticket_id, []).append(text)
+            _insert_ticket_rows(
+                cursor,
+                [_ticket_document(ticket, comments.get(ticket.pk, [])) for ticket in batch],
+            )
+            tickets += len(batch)
+
+        assets = 0
+        for batch in _batches(Asset.objects.all()):
+            _insert_asset_rows(cursor, [_asset_document(asset) for asset in batch])
+            assets += len(batch)
+    return {"tickets": tickets, "assets": assets}
+
+
+def _ranked(queryset, table: str, text: str):
+    query = fts_query(text)
+    if not query:
+        return queryset
+    model_table = queryset.model._meta.db_table
+    return (
+        queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", (query,))
+        )
+        .annotate(
+            search_rank=RawSQL(
+                f"SELECT rank FROM {table} "
+                f"WHERE {table} MATCH %s AND rowid = {model_table}.id",
+                (query,),
+            )
+        )
+        .order_by("search_rank", *queryset.query.order_by or queryset.model._meta.ordering)
+    )
+
+
+def _contains_terms(queryset, text: str, fields, extra=None):
+    """Portable fallback: every term must appear in at least one field."""
+    for term in re.findall(r"\w+", text):
+        match = Q()
+        for field in fields:
+            match |= Q(**{f"{field}__icontains": term})
+        if extra is not None:
+            match |= extra(term)
+        queryset = queryset.filter(match)
+    return queryset
+
+
+def search_tickets(tickets, text: str):
+    """Restrict ``tickets`` to matches for ``text``, best matches first."""
+    if search_enabled():
+        return _ranked(tickets, TICKET_FTS_TABLE, text)
+    return _contains_terms(
+        tickets, text, TICKET_SEARCH_FIELDS,
+        lambda term: Q(
+            pk__in=TicketComment.objects.filter(comment__icontains=term).values("ticket_id")
+        ),
+    )
+
+
+def search_assets(assets, text: str):
+    """Restrict ``assets`` to matches for ``text``, best matches first."""
+    if search_enabled():
+        return _ranked(assets, ASSET_FTS_TABLE, text)
+    return _contains_terms(assets, text, ASSET_SEARCH_FIELDS)
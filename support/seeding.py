@@ -0,0 +1,256 @@
+"""
+Synthetic load data: users, tickets, comments, events, assets and their history.
+
+Rows are generated in batches from a seeded RNG and written with
+``bulk_create`` inside one transaction, then the ticket counters, search
+index, SLA timestamps and daily rollups are rebuilt once at the end
+instead of per row.
+"""
+import random
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import ASSETS, invalidate
+from .counters import rebuild_ticket_counters
+from .models import Asset, AssetAssignment, Ticket, TicketComment, TicketEvent
+from .reports import refresh_rollups
+from .search import rebuild_search_index
+from .sla import backfill_sla
+
+BATCH_SIZE = 5000
+PASSWORD = "Load@12345"
+STAFF_SHARE = 0.05
+
+CATEGORY_WEIGHTS = {"hardware": 35, "software": 35, "network": 20, "other": 10}
+URGENCY_WEIGHTS = {"low": 45, "medium": 40, "high": 15}
+STATUS_WEIGHTS = {"open": 20, "in_progress": 15, "resolved": 40, "closed": 25}
+ASSET_STATUS_WEIGHTS = {"in_use": 70, "available": 20, "under_repair": 10}
+
+TITLES = {
+    "hardware": ["Laptop will not boot", "Monitor flickering", "Keyboard keys stuck", "Docking station not detected"],
+    "software": ["Outlook keeps crashing", "Licence expired", "Cannot install update", "VPN client error"],
+    "network": ["Wi-Fi drops every hour", "Cannot reach file share", "Slow internet on floor 3", "VPN disconnects"],
+    "other": ["Badge reader access", "New starter setup", "Printer out of toner", "Desk phone moved"],
+}
+COMMENTS = [
+    "Looking into this now.",
+    "Can you share a screenshot of the error?",
+    "Restarted the device, please check again.",
+    "Waiting on a replacement part.",
+    "Escalated to the network team.",
+    "Works for me now, thanks!",
+]
+DEVICES = {
+    "Laptop": ["Dell", "HP", "Lenovo", "Apple"],
+    "Monitor": ["Dell", "LG", "Samsung"],
+    "Phone": ["Apple", "Samsung"],
+    "Printer": ["HP", "Brother"],
+}
+
+
+def _weighted(rng, weights: dict, count: int) -> list:
+    return rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+
+def _batches(total: int, size: int):
+    for start in range(0, total, size):
+        yield min(size, total - start)
+
+
+class LoadSeeder:
+    def __init__(self, seed=None, batch_size=BATCH_SIZE, days=365, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.log = log or (lambda message: None)
+        self.run_id = uuid.UUID(int=self.rng.getrandbits(128)).hex[:8]
+        self.now = timezone.now()
+
+    def run(self, users, tickets, comments, assets, index=True) -> dict:
+        with transaction.atomic():
+            employees, staff = self.create_users(users)
+            ticket_rows = self.create_tickets(tickets, employees, staff)
+            comment_count = self.create_comments(comments, ticket_rows, employees + staff)
+            event_count = self.create_events(ticket_rows)
+            asset_count = self.create_assets(assets, employees)
+        self.log("Rebuilding ticket counters")
+        rebuild_ticket_counters()
+        self.log("Backfilling SLA timestamps")
+        backfill_sla(batch_size=self.batch_size)
+        self.log("Rebuilding daily ticket rollups")
+        refresh_rollups(rebuild=True)
+        invalidate(ASSETS)
+        if index:
+            self.log("Rebuilding search index")
+            rebuild_search_index()
+        return {
+            "users": len(employees) + len(staff),
+            "tickets": len(ticket_rows),
+            "comments": comment_count,
+            "events": event_count,
+            "assets": asset_count,
+        }
+
+    def create_users(self, count):
+        """Create ``count`` users, about 5% of them staff; return (employee ids, staff ids)."""
+        password = make_password(PASSWORD)
+        staff_count = max(1, round(count * STAFF_SHARE))
+        users = [
+            User(
+                username=f"load_{self.run_id}_{number}",
+                first_name="Load",
+                last_name=f"User {number}",
+                email=f"load_{self.run_id}_{number}@example.com",
+                password=password,
+                is_staff=number < staff_count,
+            )
+            for number in range(count)
+        ]
+        ids = [user.pk for user in User.objects.bulk_create(users, batch_size=self.batch_size)]
+        self.log(f"Created {count} users")
+        staff = ids[:staff_count]
+        return ids[staff_count:] or staff, staff
+
+    def create_tickets(self, total, employees, staff):
+        """Create tickets and return ``(id, status, created_at, employee, assignee)`` for each."""
+        rng = self.rng
+        rows = []
+        span = self.days * 24 * 3600
+        for size in _batches(total, self.batch_size):
+            categories = _weighted(rng, CATEGORY_WEIGHTS, size)
+            urgencies = _weighted(rng, URGENCY_WEIGHTS, size)
+            statuses = _weighted(rng, STATUS_WEIGHTS, size)
+            batch = []
+            for category, urgency, status in zip(categories, urgencies, statuses):
+                created_at = self.now - timedelta(seconds=rng.randrange(span))
+                assigned = status != "open" or rng.random() < 0.5
+                number = rng.randrange(100000)
+                batch.append(Ticket(
+                    title=rng.choice(TITLES[category]),
+                    category=category,
+                    description=f"Reported by load test run {self.run_id}, case {number}.",
+                    urgency=urgency,
+                    status=status,
+                    created_at=created_at,
+                    employee_id=rng.choice(employees),
+                    customer_name=f"Customer {number}",
+                    customer_email=f"customer{number}@example.com",
+                    customer_phone=f"555{number:07d}",
+                    resolution_notes="Fixed." if status in ("resolved", "closed") else "",
+                    assigned_to_id=rng.choice(staff) if assigned else None,
+                ))
+            created = Ticket.objects.bulk_create(batch)
+            rows.extend(
+                (ticket.pk, ticket.status, ticket.created_at, ticket.employee_id, ticket.assigned_to_id)
+                for ticket in created
+            )
+            self.log(f"Created {len(rows)} of {total} tickets")
+        return rows
+
+    def create_comments(self, total, tickets, authors):
+        """Spread comments over tickets, each within two weeks of the ticket opening."""
+        if not tickets:
+            return 0
+        rng = self.rng
+        created = 0
+        for size in _batches(total, self.batch_size):
+            batch = []
+            for _ in range(size):
+                ticket_id, _status, opened, _employee, _assignee = rng.choice(tickets)
+                batch.append(TicketComment(
+                    ticket_id=ticket_id,
+                    user_id=rng.choice(authors),
+                    comment=rng.choice(COMMENTS),
+                    created_at=self._after(opened, 14 * 24 * 60),
+                ))
+            TicketComment.objects.bulk_create(batch)
+            created += size
+            self.log(f"Created {created} of {total} comments")
+        return created
+
+    def _after(self, start, max_minutes):
+        return min(start + timedelta(minutes=self.rng.randrange(1, max_minutes)), self.now)
+
+    def create_events(self, tickets):
+        """
+        Log each ticket's creation, its assignment within a day and, unless it
+        is still open, the status change that left it where it is.
+        """
+        created = 0
+        for start in range(0, len(tickets), self.batch_size):
+            batch = []
+            for ticket_id, status, opened, employee, assignee in tickets[start:start + self.batch_size]:
+                batch.append(TicketEvent(
+                    ticket_id=ticket_id, actor_id=employee, event_type="created",
+                    new_value="open", created_at=opened,
+                ))
+                if assignee:
+                    assigned_at = self._after(opened, 24 * 60)
+                    batch.append(TicketEvent(
+                        ticket_id=ticket_id, actor_id=assignee, event_type="assigned",
+                        new_value=str(assignee), created_at=assigned_at,
+                    ))
+                    if status != "open":
+                        batch.append(TicketEvent(
+                            ticket_id=ticket_id, actor_id=assignee, event_type="status",
+                            old_value="open", new_value=status,
+                            created_at=self._after(assigned_at, 14 * 24 * 60),
+                        ))
+            TicketEvent.objects.bulk_create(batch)
+            created += len(batch)
+            self.log(f"Created {created} events")
+        return created
+
+    def create_assets(self, total, employees):
+        rng = self.rng
+        created = 0
+        today = self.now.date()
+        devices = list(DEVICES)
+        for size in _batches(total, self.batch_size):
+            statuses = _weighted(rng, ASSET_STATUS_WEIGHTS, size)
+            batch = []
+            for status in statuses:
+                device = rng.choice(devices)
+                purchased = today - timedelta(days=rng.randrange(4 * 365))
+                batch.append(Asset(
+                    device_type=device,
+                    brand=rng.choice(DEVICES[device]),
+                    serial_number=f"LD-{self.run_id}-{created + len(batch):07d}",
+                    purchase_date=purchased,
+                    warranty_expiry=purchased + timedelta(days=rng.choice([365, 730, 1095])),
+                    status=status,
+                    assigned_to_id=rng.choice(employees) if status == "in_use" else None,
+                ))
+            Asset.objects.bulk_create(batch)
+            AssetAssignment.objects.bulk_create(self.asset_history(batch, employees))
+            created += size
+            self.log(f"Created {created} of {total} assets")
+        return created
+
+    def asset_history(self, assets, employees) -> list:
+        """
+        Intervals leading to each asset's current state: in stock after
+        purchase, then in use, and for some assets back in stock or in repair.
+        """
+        rng = self.rng
+        intervals = []
+        for asset in assets:
+            start = timezone.make_aware(datetime.combine(asset.purchase_date, time.min))
+            if asset.status == "in_use":
+                steps = [("available", None), ("in_use", asset.assigned_to_id)]
+            else:
+                steps = [("available", None), ("in_use", rng.choice(employees)), (asset.status, None)]
+            for number, (status, user_id) in enumerate(steps):
+                last = number == len(steps) - 1
+                # Each change happens between the previous one and now.
+                end = None if last else start + (self.now - start) * rng.uniform(0.1, 0.6)
+                intervals.append(AssetAssignment(
+                    asset_id=asset.pk, assigned_to_id=user_id, status=status, valid_from=start, valid_to=end,
+                ))
+                start = end
+        return intervals
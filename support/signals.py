@@ -0,0 +1,188 @@
+from django.contrib.auth.models import Group, User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .asset_history import record_assignment
+from .caching import ASSETS, TICKETS, invalidate
+from .counters import apply_delta, counter_key, stored_counter_key
+from .db import configure_sqlite_connection
+from .events import created_events, record_events
+from .metrics import record_created_tickets
+from .models import Asset, Ticket, TicketComment
+from .notifications import comment_added, ticket_created
+from .profiling import install_query_profiler
+from .search import index_asset, index_ticket, unindex_asset, unindex_ticket
+from .sla import record_response, stamp_ticket
+from .utils import invalidate_role_cache
+
+
+@receiver(connection_created)
+def tune_new_connection(sender, connection, **kwargs):
+    configure_sqlite_connection(connection)
+    install_query_profiler(connection)
+
+
+@receiver(pre_save, sender=Ticket)
+def prepare_ticket_save(sender, instance, raw=False, **kwargs):
+    """
+    Capture the stored counter key so post_save can move the count, then
+    stamp SLA fields from the same row. One receiver keeps the order explicit.
+    """
+    if raw or instance.pk is None:
+        instance._previous_counter_key = None
+    else:
+        instance._previous_counter_key = stored_counter_key(instance.pk)
+    if raw:
+        return
+    previous = instance._previous_counter_key
+    if previous is None:
+        stamp_ticket(instance)
+    else:
+        _employee_id, status, _category, urgency, _assigned = previous
+        stamp_ticket(instance, status, urgency)
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_counter_key", None)
+    current = counter_key(instance)
+    if previous == current:
+        return
+    if previous is not None:
+        apply_delta(previous, -1)
+    apply_delta(current, 1)
+
+
+@receiver(post_delete, sender=Ticket)
+def decrement_ticket_counters(sender, instance, **kwargs):
+    apply_delta(counter_key(instance), -1)
+
+
+@receiver(post_save, sender=Ticket)
+def index_saved_ticket(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_ticket(instance)
+
+
+@receiver(post_delete, sender=Ticket)
+def unindex_deleted_ticket(sender, instance, **kwargs):
+    unindex_ticket(instance.pk)
+
+
+@receiver(post_save, sender=TicketComment)
+@receiver(post_delete, sender=TicketComment)
+def reindex_commented_ticket(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if TicketComment.ticket.is_cached(instance) and Ticket.employee.is_cached(instance.ticket):
+        # The views attach the ticket they already loaded; reuse it.
+        ticket = instance.ticket
+    else:
+        ticket = Ticket.objects.select_related("employee").filter(pk=instance.ticket_id).first()
+    if ticket is not None:
+        index_ticket(ticket)
+
+
+@receiver(pre_save, sender=Asset)
+def remember_asset_assignment(sender, instance, raw=False, **kwargs):
+    """Capture the stored assignee and status so post_save can log a change."""
+    if raw or instance.pk is None:
+        instance._previous_assignment = None
+    else:
+        instance._previous_assignment = (
+            Asset.objects.filter(pk=instance.pk).values_list("assigned_to_id", "status").first()
+        )
+
+
+@receiver(post_save, sender=Asset)
+def log_asset_assignment(sender, instance, raw=False, **kwargs):
+    """Views set ``_changed_by`` to the user making the change."""
+    if not raw:
+        record_assignment(
+            instance, getattr(instance, "_previous_assignment", None), getattr(instance, "_changed_by", None)
+        )
+
+
+@receiver(post_save, sender=Asset)
+def index_saved_asset(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_asset(instance)
+
+
+@receiver(post_delete, sender=Asset)
+def unindex_deleted_asset(sender, instance, **kwargs):
+    unindex_asset(instance.pk)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_save, sender=TicketComment)
+@receiver(post_delete, sender=TicketComment)
+def invalidate_ticket_views(sender, instance, **kwargs):
+    invalidate(TICKETS)
+
+
+@receiver(post_save, sender=Ticket)
+def count_created_ticket(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_created_tickets([instance])
+
+
+@receiver(post_save, sender=Ticket)
+def log_created_ticket(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_events(created_events([instance]))
+
+
+@receiver(post_save, sender=Ticket)
+def notify_created_ticket(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ticket_created(instance)
+
+
+@receiver(post_save, sender=TicketComment)
+def record_first_response(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_response(instance)
+
+
+@receiver(post_save, sender=TicketComment)
+def notify_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        comment_added(instance)
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def invalidate_asset_views(sender, instance, **kwargs):
+    invalidate(ASSETS)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_views(sender, instance, update_fields=None, **kwargs):
+    # Dashboards show user names; logging in only touches last_login.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate(TICKETS, ASSETS)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_group_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_role_cache(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            invalidate_role_cache(user_id)
+    else:
+        invalidate_role_cache()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_roles(sender, instance, raw=False, **kwargs):
+    invalidate_role_cache()
@@ -0,0 +1,195 @@
+"""
+SLA timestamps and due dates on ``Ticket``.
+
+Each ticket stores when IT first responded and when it was resolved and
+closed, next to the response and resolution deadlines for its urgency
+(``settings.SLA_RESPONSE_HOURS`` and ``settings.SLA_RESOLUTION_HOURS``,
+counted in calendar hours). ``stamp_ticket`` keeps them current on every
+save and ``record_response`` on every comment, so reports and the breach
+listing are plain indexed range queries. Tickets from before these fields
+existed are filled in from their comments and events by ``backfill_sla``.
+"""
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Ticket, TicketComment, TicketEvent
+
+# Status changes were logged as comments before TicketEvent existed.
+STATUS_CHANGE_RE = re.compile(r"^Status changed from (?P<old>.+) to (?P<new>.+)$")
+DONE_STATUSES = ("resolved", "closed")
+SLA_FIELDS = [
+    "response_due_at", "resolution_due_at", "first_response_at", "resolved_at", "closed_at",
+]
+STATUS_VALUES = {label: value for value, label in Ticket.STATUS_CHOICES}
+BREACH_KINDS = ("response", "resolution")
+
+
+def sla_hours(urgency: str) -> tuple:
+    """Return ``(response_hours, resolution_hours)`` for an urgency."""
+    response = getattr(settings, "SLA_RESPONSE_HOURS", {"high": 1, "medium": 4, "low": 8})
+    resolution = getattr(settings, "SLA_RESOLUTION_HOURS", {"high": 8, "medium": 24, "low": 72})
+    return response[urgency], resolution[urgency]
+
+
+def set_due_dates(ticket: Ticket, opened) -> None:
+    response, resolution = sla_hours(ticket.urgency)
+    ticket.response_due_at = opened + timedelta(hours=response)
+    ticket.resolution_due_at = opened + timedelta(hours=resolution)
+
+
+def apply_status(ticket: Ticket, old_status, new_status, at) -> None:
+    """Move the status timestamps for a change from ``old_status`` at ``at``."""
+    if new_status != "open" and ticket.first_response_at is None:
+        ticket.first_response_at = at
+    if new_status in DONE_STATUSES:
+        ticket.resolved_at = ticket.resolved_at or at
+        if new_status == "closed":
+            ticket.closed_at = ticket.closed_at or at
+        elif old_status == "closed":
+            ticket.closed_at = None
+    else:
+        # Reopened: the resolution clock runs against the original deadline.
+        ticket.resolved_at = None
+        ticket.closed_at = None
+
+
+def stamp_ticket(ticket: Ticket, old_status=None, old_urgency=None, now=None) -> None:
+    """
+    Update a ticket's SLA fields before it is saved.
+
+    ``old_status`` and ``old_urgency`` are the stored values, or None for a
+    new ticket.
+    """
+    now = now or timezone.now()
+    if ticket.response_due_at is None or ticket.urgency != old_urgency:
+        set_due_dates(ticket, ticket.created_at or now)
+    if ticket.status != old_status and (old_status is not None or ticket.status != "open"):
+        apply_status(ticket, old_status, ticket.status, now)
+
+
+def record_response(comment: TicketComment) -> int:
+    """Stamp the ticket's first response if ``comment`` is IT's first reply."""
+    if TicketComment.ticket.is_cached(comment):
+        # The views attach the ticket they loaded, which usually settles it.
+        ticket = comment.ticket
+        if ticket.first_response_at is not None or ticket.employee_id == comment.user_id:
+            return 0
+        ticket.first_response_at = comment.created_at
+    return (
+        Ticket.objects.filter(pk=comment.ticket_id, first_response_at=None)
+        .exclude(employee_id=comment.user_id)
+        .update(first_response_at=comment.created_at)
+    )
+
+
+def sla_breaches(kind=None, now=None):
+    """
+    Tickets past a deadline they have not met, most overdue first.
+
+    ``kind`` is ``"response"``, ``"resolution"`` or None for either. Each
+    condition is a range scan on a partial index of the unmet deadlines.
+    """
+    now = now or timezone.now()
+    response = Q(first_response_at=None, response_due_at__lt=now)
+    resolution = Q(resolved_at=None, resolution_due_at__lt=now)
+    conditions = {"response": response, "resolution": resolution}.get(kind, response | resolution)
+    return Ticket.objects.filter(conditions).order_by(*breach_ordering(kind))
+
+
+def breach_ordering(kind=None) -> list:
+    return [f"{kind or 'resolution'}_due_at", "id"]
+
+
+def _legacy_status(text: str):
+    change = STATUS_CHANGE_RE.match(text)
+    return STATUS_VALUES.get(change.group("new")) if change else None
+
+
+def replay_history(ticket: Ticket, comments, status_events=()) -> None:
+    """
+    Rebuild ``ticket``'s SLA fields from its history.
+
+    ``comments`` are ``(user_id, text, created_at)`` and ``status_events``
+    ``(new_status, created_at)``; comments in the old "Status changed" form
+    count as status changes too.
+    """
+    ticket.first_response_at = ticket.resolved_at = ticket.closed_at = None
+    set_due_dates(ticket, ticket.created_at)
+    history = sorted(
+        [(created_at, user_id, _legacy_status(text)) for user_id, text, created_at in comments]
+        + [(created_at, None, new_status) for new_status, created_at in status_events],
+        key=lambda entry: entry[0],
+    )
+    status = "open"
+    for created_at, user_id, new_status in history:
+        if new_status:
+            apply_status(ticket, status, new_status, created_at)
+            status = new_status
+        elif user_id != ticket.employee_id and ticket.first_response_at is None:
+            ticket.first_response_at = created_at
+    if ticket.status in DONE_STATUSES and ticket.resolved_at is None:
+        # Finished without a recorded change: the last activity is our best guess.
+        last_activity = history[-1][0] if history else ticket.created_at
+        apply_status(ticket, status, ticket.status, last_activity)
+
+
+def save_sla_fields(tickets) -> None:
+    """
+    Write the SLA fields of ``tickets`` with one ``executemany``.
+
+    ``bulk_update`` builds a ``CASE`` over every row of the batch for each
+    column, which made backfilling 20k tickets take 22s instead of 2s.
+    """
+    quote = connection.ops.quote_name
+    adapt = connection.ops.adapt_datetimefield_value
+    assignments = ", ".join(f"{quote(field)} = %s" for field in SLA_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {quote(Ticket._meta.db_table)} SET {assignments} WHERE id = %s",
+            [[adapt(getattr(ticket, field)) for field in SLA_FIELDS] + [ticket.pk] for ticket in tickets],
+        )
+
+
+def backfill_sla(batch_size=1000, only_missing=True, log=None) -> int:
+    """
+    Fill in SLA fields from comments and status events, ``batch_size`` tickets at a time.
+
+    With ``only_missing``, tickets that already have due dates are skipped,
+    so an interrupted run can be resumed. Returns the tickets updated.
+    """
+    log = log or (lambda message: None)
+    tickets = Ticket.objects.order_by("pk").only(
+        "pk", "employee", "status", "urgency", "created_at", *SLA_FIELDS
+    )
+    if only_missing:
+        tickets = tickets.filter(response_due_at=None)
+    updated, last_pk = 0, 0
+    while batch := list(tickets.filter(pk__gt=last_pk)[:batch_size]):
+        ids = [ticket.pk for ticket in batch]
+        comments, changes = {}, {}
+        rows = (
+            TicketComment.objects.filter(ticket_id__in=ids)
+            .order_by("ticket_id", "created_at", "id")
+            .values_list("ticket_id", "user_id", "comment", "created_at")
+        )
+        for ticket_id, *row in rows.iterator():
+            comments.setdefault(ticket_id, []).append(row)
+        rows = (
+            TicketEvent.objects.filter(ticket_id__in=ids, event_type="status")
+            .order_by("ticket_id", "created_at", "id")
+            .values_list("ticket_id", "new_value", "created_at")
+        )
+        for ticket_id, *row in rows.iterator():
+            changes.setdefault(ticket_id, []).append(row)
+        for ticket in batch:
+            replay_history(ticket, comments.get(ticket.pk, []), changes.get(ticket.pk, []))
+        save_sla_fields(batch)
+        updated += len(batch)
+        last_pk = batch[-1].pk
+        log(f"Backfilled {updated} tickets")
+    return updated
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Asset, Ticket, TicketCounter
+from .warranty import warranty_aggregates
+
+ACTIVE_STATUSES = ["open", "in_progress"]
+RECENT_DAYS = 7
+
+
+def _stat_filters(unassigned: Q) -> dict:
+    """Return the filter for every statistic, given how to spot unassigned rows."""
+    filters = {
+        "total": Q(),
+        "high_urgency": Q(urgency="high", status__in=ACTIVE_STATUSES),
+        "unassigned": unassigned & Q(status__in=ACTIVE_STATUSES),
+    }
+    for value, _label in Ticket.STATUS_CHOICES:
+        filters[value] = Q(status=value)
+    for value, _label in Ticket.CATEGORY_CHOICES:
+        filters[f"category_{value}"] = Q(category=value)
+    return filters
+
+
+def _format_stats(row: dict, recent: int) -> dict:
+    return {
+        "total": row["total"],
+        "open": row["open"],
+        "in_progress": row["in_progress"],
+        "resolved": row["resolved"],
+        "closed": row["closed"],
+        "high_urgency": row["high_urgency"],
+        "unassigned": row["unassigned"],
+        "recent": recent,
+        "categories": {
+            value: row[f"category_{value}"]
+            for value, _label in Ticket.CATEGORY_CHOICES
+        },
+    }
+
+
+def _stat_queries(employee, assigned_to):
+    """
+    Return ``(rows, aggregates, recent)`` for a ticket scope.
+
+    ``recent`` is a queryset to count separately, or None when the recent
+    count is one of the aggregates.
+    """
+    since = timezone.now() - timedelta(days=RECENT_DAYS)
+    if assigned_to is not None:
+        tickets = Ticket.objects.filter(assigned_to=assigned_to)
+        if employee is not None:
+            tickets = tickets.filter(employee=employee)
+        aggregates = {
+            name: Count("id", filter=condition or None)
+            for name, condition in _stat_filters(Q(assigned_to__isnull=True)).items()
+        }
+        aggregates["recent"] = Count("id", filter=Q(created_at__gte=since))
+        return tickets.order_by(), aggregates, None
+
+    counters = TicketCounter.objects.all()
+    tickets = Ticket.objects.all()
+    if employee is not None:
+        counters = counters.filter(employee=employee)
+        tickets = tickets.filter(employee=employee)
+    aggregates = {
+        name: Coalesce(Sum("count", filter=condition or None), 0)
+        for name, condition in _stat_filters(Q(assigned=False)).items()
+    }
+    return counters, aggregates, tickets.filter(created_at__gte=since)
+
+
+def ticket_stats(employee: User = None, assigned_to: User = None) -> dict:
+    """
+    Compute dashboard statistics for a ticket scope.
+
+    With no arguments the scope is every ticket; ``employee`` narrows it to
+    the tickets a user raised and ``assigned_to`` to the tickets they own.
+    Global and per-employee scopes read the ``TicketCounter`` table; the
+    per-assignee scope aggregates the tickets in one query.
+    """
+    rows, aggregates, recent = _stat_queries(employee, assigned_to)
+    row = rows.aggregate(**aggregates)
+    return _format_stats(row, row["recent"] if recent is None else recent.count())
+
+
+async def aticket_stats(employee: User = None, assigned_to: User = None) -> dict:
+    """``ticket_stats`` for async views, running its two queries concurrently."""
+    rows, aggregates, recent = _stat_queries(employee, assigned_to)
+    if recent is None:
+        row = await rows.aaggregate(**aggregates)
+        return _format_stats(row, row["recent"])
+    row, recent_count = await asyncio.gather(rows.aaggregate(**aggregates), recent.acount())
+    return _format_stats(row, recent_count)
+
+
+def category_breakdown(stats: dict) -> list:
+    """Return non-empty category counts ordered by count, for the charts."""
+    rows = [
+        {"category": category, "count": count}
+        for category, count in stats["categories"].items()
+        if count
+    ]
+    return sorted(rows, key=lambda row: row["count"], reverse=True)
+
+
+def asset_aggregates(today) -> dict:
+    """Aggregates for the asset list stats: assets per status and warranty counts."""
+    return {
+        **{value: Count("id", filter=Q(status=value)) for value, _label in Asset.STATUS_CHOICES},
+        **warranty_aggregates(today),
+    }
@@ -0,0 +1,173 @@
+"""
+A small task queue stored in the ``Task`` table.
+
+Views call ``enqueue`` inside their own transaction, so a task exists if and
+only if the change that caused it was committed, and return without doing
+the work. ``manage.py run_worker`` processes claim batches of due tasks:
+on PostgreSQL with ``SELECT ... FOR UPDATE SKIP LOCKED``, on SQLite under
+the database write lock that our ``IMMEDIATE`` transactions take. A failed
+task is retried with exponential backoff up to ``max_attempts`` times, and
+a task left ``running`` by a worker that died is picked up again once its
+lock is older than ``settings.TASK_LOCK_TIMEOUT`` seconds.
+
+A task runs in one transaction with its "done" mark unless it is registered
+with ``atomic=False``, for work such as sending email that cannot be rolled
+back and commits its own progress as it goes.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name: str, max_attempts: int = 3, atomic: bool = True):
+    """Register a function as the handler for tasks called ``name``."""
+    def register(func):
+        _registry[name] = (func, max_attempts, atomic)
+        return func
+    return register
+
+
+def enqueue(name: str, delay: float = 0, **payload) -> Task:
+    """Queue ``name`` to run with ``payload`` as keyword arguments."""
+    if name not in _registry:
+        raise KeyError(f"Unknown task {name!r}")
+    _func, max_attempts, _atomic = _registry[name]
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def lock_timeout() -> int:
+    return getattr(settings, "TASK_LOCK_TIMEOUT", 300)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retry number ``attempts``: 10s, 20s, 40s, ..."""
+    return getattr(settings, "TASK_RETRY_DELAY", 10) * 2 ** (attempts - 1)
+
+
+class Worker:
+    def __init__(self, name=None, batch_size=10):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size
+
+    def claim(self) -> list:
+        """Lock up to ``batch_size`` due tasks for this worker and return them."""
+        now = timezone.now()
+        stale = Q(status="running", locked_at__lt=now - timedelta(seconds=lock_timeout()))
+        due = Q(status="queued", run_after__lte=now) | (stale & Q(attempts__lt=F("max_attempts")))
+        # Check with a plain read first: idle workers should not keep taking
+        # the write lock.
+        if not Task.objects.filter(due | stale).exists():
+            return []
+        with transaction.atomic():
+            # A task that keeps killing its worker is not retried forever.
+            Task.objects.filter(stale, attempts__gte=F("max_attempts")).update(
+                status="failed", finished_at=now, last_error=f"Lock expired on {now.isoformat()}"
+            )
+            ids = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(due)
+                .order_by("run_after", "id")
+                .values_list("id", flat=True)[:self.batch_size]
+            )
+            if not ids:
+                return []
+            Task.objects.filter(id__in=ids).update(
+                status="running", locked_by=self.name, locked_at=now, attempts=F("attempts") + 1
+            )
+        return list(Task.objects.filter(id__in=ids, locked_by=self.name).order_by("run_after", "id"))
+
+    def execute(self, task: Task) -> bool:
+        """Run one claimed task and record the outcome; True if it succeeded."""
+        func, _max_attempts, atomic = _registry.get(task.name, (None, None, True))
+        started = time.perf_counter()
+        try:
+            if func is None:
+                raise KeyError(f"Unknown task {task.name!r}")
+            # The task's writes and its "done" mark commit together.
+            with transaction.atomic() if atomic else nullcontext():
+                func(**task.payload)
+                Task.objects.filter(pk=task.pk).update(
+                    status="done", finished_at=timezone.now(), last_error=""
+                )
+        except Exception:
+            error = traceback.format_exc()
+            final = task.attempts >= task.max_attempts
+            Task.objects.filter(pk=task.pk).update(
+                status="failed" if final else "queued",
+                run_after=timezone.now() + timedelta(seconds=retry_delay(task.attempts)),
+                finished_at=timezone.now() if final else None,
+                last_error=error,
+                locked_by="",
+                locked_at=None,
+            )
+            logger.warning(
+                "Task %s #%s failed (attempt %s of %s)",
+                task.name, task.pk, task.attempts, task.max_attempts, exc_info=True,
+            )
+            return False
+        logger.debug(
+            "Task %s #%s done in %.1f ms", task.name, task.pk, (time.perf_counter() - started) * 1000
+        )
+        return True
+
+    def run_once(self) -> int:
+        """Claim and run one batch; return how many tasks were run."""
+        tasks = self.claim()
+        for claimed in tasks:
+            self.execute(claimed)
+        return len(tasks)
+
+    def run(self, poll_interval=1.0, burst=False, should_stop=lambda: False) -> int:
+        """
+        Process tasks until ``should_stop()`` returns True.
+
+        With ``burst``, return as soon as no task is due instead of polling.
+        """
+        processed = 0
+        while not should_stop():
+            close_old_connections()
+            count = self.run_once()
+            processed += count
+            if not count:
+                if burst:
+                    break
+                time.sleep(poll_interval)
+        return processed
+
+
+def run_pending_tasks() -> int:
+    """Run every task that is due now in this process; for tests and scripts."""
+    worker = Worker(name="inline")
+    processed = 0
+    while count := worker.run_once():
+        processed += count
+    return processed
+
+
+def purge_finished(days: int) -> int:
+    """Delete tasks that finished (done or failed) more than ``days`` ago."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _by_model = Task.objects.filter(
+        status__in=["done", "failed"], finished_at__lt=cutoff
+    ).delete()
+    return deleted
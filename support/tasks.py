@@ -0,0 +1,57 @@
+"""
+Background tasks run by ``manage.py run_worker``.
+
+Importing this module registers the handlers; ``SupportConfig.ready`` does
+that so every process that can enqueue a task can also run it.
+"""
+from django.db import transaction
+
+from .events import record_events, ticket_changes
+from .metrics import record_status_events
+from .models import TicketEvent
+from .notifications import SEND_NOTIFICATIONS, events_recorded, send_due_digests
+from .reports import REFRESH_ROLLUPS, refresh_rollups
+from .taskqueue import enqueue, task
+
+TICKET_EVENTS = "ticket_events"
+
+
+@task(TICKET_EVENTS, max_attempts=5)
+def process_ticket_events(event_ids):
+    """Notify about newly recorded ticket events."""
+    events = list(
+        TicketEvent.objects.filter(pk__in=event_ids)
+        .select_related("ticket__assigned_to", "actor")
+        .order_by("created_at", "id")
+    )
+    events_recorded(events)
+
+
+@task(SEND_NOTIFICATIONS, max_attempts=5, atomic=False)
+def send_notifications():
+    """Send the notification digests that are due; each digest's sent mark commits on its own."""
+    send_due_digests()
+
+
+@task(REFRESH_ROLLUPS)
+def refresh_ticket_rollups():
+    """Bring the daily ticket rollups up to date."""
+    refresh_rollups()
+
+
+def record_ticket_changes(ticket, user, changed_at, old_status, old_assigned_id, old_urgency):
+    """
+    Log an admin's ticket update as events and queue their side effects.
+
+    Call inside the update's transaction, so both commit with it. The
+    time-to-resolve histogram is observed here, in the process that serves
+    ``/metrics``, once the events have committed, so a retried task cannot
+    count a resolution twice.
+    """
+    events = ticket_changes(ticket, user, changed_at, old_status, old_assigned_id, old_urgency)
+    if not events:
+        return []
+    record_events(events)
+    transaction.on_commit(lambda: record_status_events(events))
+    enqueue(TICKET_EVENTS, event_ids=[event.pk for event in events])
+    return events
@@ -1,18 +1,37 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
-urlpatterns = [
-    path("", views.home, name="home"),
-    path("login/", views.login_view, name="login"),
-    path("logout/", views.logout_view, name="logout"),
-    path("employee/dashboard/", views.employee_dashboard, name="employee_dashboard"),
-    path("employee/ticket/new/", views.raise_ticket, name="raise_ticket"),
-    path("employee/ticket/<int:pk>/", views.ticket_detail, name="ticket_detail"),
-    path("profile/", views.user_profile, name="user_profile"),
-    path("admin/dashboard/", views.admin_dashboard, name="admin_dashboard"),
-    path("admin/tickets/<int:pk>/edit/", views.admin_ticket_edit, name="admin_ticket_edit"),
-    path("admin/tickets/export/", views.export_tickets_csv, name="export_tickets_csv"),
-    path("admin/assets/", views.asset_list, name="asset_list"),
-    path("admin/assets/add/", views.asset_add, name="asset_add"),
-    path("admin/assets/<int:pk>/edit/", views.asset_edit, name="asset_edit"),
-]
+
+def support_patterns(read_views):
+    """
+    The app's routes, with the read-heavy pages taken from ``read_views``:
+    ``support.async_views`` under ASGI, ``support.views`` otherwise.
+    """
+    return [
+        path("", views.home, name="home"),
+        path("login/", views.login_view, name="login"),
+        path("logout/", views.logout_view, name="logout"),
+        path("employee/dashboard/", read_views.employee_dashboard, name="employee_dashboard"),
+        path("employee/ticket/new/", views.raise_ticket, name="raise_ticket"),
+        path("employee/ticket/<int:pk>/", read_views.ticket_detail, name="ticket_detail"),
+        path("employee/ticket/<int:pk>/attachment/<str:variant>/", views.ticket_attachment,
+             name="ticket_attachment"),
+        path("profile/", views.user_profile, name="user_profile"),
+        path("admin/dashboard/", read_views.admin_dashboard, name="admin_dashboard"),
+        path("admin/tickets/<int:pk>/edit/", views.admin_ticket_edit, name="admin_ticket_edit"),
+        path("admin/tickets/export/", views.export_tickets_csv, name="export_tickets_csv"),
+        path("admin/tickets/export/<str:name>/", views.export_download, name="export_download"),
+        path("admin/sla/", views.sla_breach_list, name="sla_breaches"),
+        path("admin/reports/tickets/", views.ticket_trend_data, name="ticket_trends"),
+        path("admin/assets/", read_views.asset_list, name="asset_list"),
+        path("admin/assets/inventory/", views.asset_inventory, name="asset_inventory"),
+        path("admin/assets/add/", views.asset_add, name="asset_add"),
+        path("admin/assets/<int:pk>/edit/", views.asset_edit, name="asset_edit"),
+        path("admin/import/", views.import_upload, name="import_upload"),
+        path("admin/metrics/", views.metrics_dashboard, name="metrics_dashboard"),
+        path("metrics", views.metrics_endpoint, name="metrics"),
+    ]
+
+
+urlpatterns = support_patterns(async_views if settings.ASYNC_VIEWS else views)
@@ -1,15 +1,44 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
+
+IT_ADMIN_GROUP = "IT Admin"
+ROLE_CACHE_TIMEOUT = 300
+ROLE_CACHE_VERSION_KEY = "support:role:version"
+
+
+def _role_cache_key(user_id) -> str:
+    version = cache.get_or_set(ROLE_CACHE_VERSION_KEY, 1, None)
+    return f"support:role:{version}:{user_id}"
+
+
+def invalidate_role_cache(user_id=None) -> None:
+    """Forget cached roles for one user, or for everyone when ``user_id`` is None."""
+    if user_id is None:
+        try:
+            cache.incr(ROLE_CACHE_VERSION_KEY)
+        except ValueError:
+            cache.set(ROLE_CACHE_VERSION_KEY, 2, None)
+        return
+    cache.delete(_role_cache_key(user_id))
 
 
 def is_it_admin(user: User) -> bool:
     """
     Check if a user is an IT Admin.
 
-    Uses is_staff OR membership in the 'IT Admin' group.
+    Uses is_staff OR membership in the 'IT Admin' group. Group membership is
+    memoized on the user object, so it is looked up at most once per request,
+    and cached across requests until the user's groups change.
     """
     if not user.is_authenticated:
         return False
     if user.is_staff:
         return True
-    return user.groups.filter(name="IT Admin").exists()
-
+    if not hasattr(user, "_is_it_admin"):
+        key = _role_cache_key(user.pk)
+        in_group = cache.get(key)
+        if in_group is None:
+            in_group = user.groups.filter(name=IT_ADMIN_GROUP).exists()
+            cache.set(key, in_group, ROLE_CACHE_TIMEOUT)
+        user._is_it_admin = in_group
+    return user._is_it_admin
@@ -1,12 +1,16 @@
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import render, redirect, get_object_or_404
-from django.core.paginator import Paginator
-from django.db.models import Q, Count
-from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse,
+)
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
 from django.contrib import messages
+from django.db import transaction
+from django.utils import timezone
 import csv
-from datetime import datetime, timedelta
 
 from .forms import (
     LoginForm,
@@ -15,9 +19,82 @@ from .forms import (
     AssetForm,
     AssetAssignForm,
     TicketCommentForm,
+    ImportUploadForm,
+    InventoryForm,
+)
+from .asset_history import end_of_day, holder_at, inventory_counts, inventory_table
+from .attachments import ATTACHMENT_VARIANTS, attachment_response, max_attachment_size
+from .caching import ASSETS, TICKETS, cache_stats, cached
+from .db import reads_from_replica
+from .events import describe_events, merge_timeline, newest_events
+from .exports import (
+    export_path,
+    export_querystring,
+    export_status,
+    start_background_export,
+    stream_ticket_csv,
 )
+from .filters import admin_ticket_queryset, asset_queryset
+from .imports import IMPORTERS, guess_format, read_rows, text_handle
 from .models import Ticket, Asset, TicketComment
+from .metrics import REGISTRY
+from .profiling import sample_rate, view_metrics
+from .pagination import ASSET_CURSOR_ORDERING, TICKET_CURSOR_ORDERING, paginate
+from .reports import BUCKETS, CATEGORIES, MAX_DAYS, ticket_trends
+from .search import search_tickets
+from .sla import BREACH_KINDS, breach_ordering, sla_breaches
+from .stats import asset_aggregates, ticket_stats, category_breakdown
+from .tasks import record_ticket_changes
 from .utils import is_it_admin
+from .warranty import with_warranty
+
+IMPORT_ERRORS_SHOWN = 100
+ASSET_HISTORY_SHOWN = 20
+COMMENTS_PER_PAGE = 50
+
+
+def comments_shown(request) -> int:
+    """How many comments to show; ``?comments=N`` widens the window for "load more"."""
+    try:
+        return max(int(request.GET.get("comments", COMMENTS_PER_PAGE)), COMMENTS_PER_PAGE)
+    except ValueError:
+        return COMMENTS_PER_PAGE
+
+
+def newest_comments(ticket_id, shown):
+    """One more than ``shown`` of a ticket's newest comments, with their authors."""
+    return (
+        TicketComment.objects.filter(ticket_id=ticket_id)
+        .select_related("user")
+        .order_by("-created_at", "-id")[:shown + 1]
+    )
+
+
+def thread_context(comments: list, events: list, shown: int) -> dict:
+    """
+    The newest ``shown`` comments and events, oldest first.
+
+    Both lists are newest first and hold up to ``shown + 1`` rows, so the
+    merged list tells whether anything older is left.
+    """
+    newest = merge_timeline(comments, events)
+    has_more = len(newest) > shown
+    timeline = newest[:shown]
+    describe_events(timeline)
+    timeline.reverse()
+    return {
+        "comments": timeline,
+        "has_more_comments": has_more,
+        "more_comments": shown + COMMENTS_PER_PAGE,
+    }
+
+
+def comment_thread(request, ticket):
+    """Load the newest comments and events of a ticket, with their authors."""
+    shown = comments_shown(request)
+    return thread_context(
+        list(newest_comments(ticket.pk, shown)), list(newest_events(ticket.pk, shown + 1)), shown
+    )
 
 
 def login_view(request):
@@ -45,21 +122,26 @@ def logout_view(request):
 
 
 @login_required
+@reads_from_replica
 def employee_dashboard(request):
     """Employee dashboard with own tickets and assigned assets."""
     tickets = Ticket.objects.filter(employee=request.user)
     assets = Asset.objects.filter(assigned_to=request.user)
+    user_key = [request.user.pk]
     
     # Statistics
-    stats = {
-        "total_tickets": tickets.count(),
-        "open_tickets": tickets.filter(status="open").count(),
-        "in_progress": tickets.filter(status="in_progress").count(),
-        "resolved": tickets.filter(status="resolved").count(),
-        "closed": tickets.filter(status="closed").count(),
-        "high_urgency": tickets.filter(urgency="high", status__in=["open", "in_progress"]).count(),
-        "total_assets": assets.count(),
-    }
+    def employee_stats():
+        ticket_totals = ticket_stats(employee=request.user)
+        return {
+            "total_tickets": ticket_totals["total"],
+            "open_tickets": ticket_totals["open"],
+            "in_progress": ticket_totals["in_progress"],
+            "resolved": ticket_totals["resolved"],
+            "closed": ticket_totals["closed"],
+            "high_urgency": ticket_totals["high_urgency"],
+            "total_assets": assets.count(),
+        }
+    stats = cached("employee_stats", [TICKETS, ASSETS], user_key, employee_stats)
     
     # Recent tickets (last 5)
     recent_tickets = tickets[:5]
@@ -67,18 +149,26 @@ def employee_dashboard(request):
     # Pagination
     search_query = request.GET.get("search", "")
     if search_query:
-        tickets = tickets.filter(
-            Q(title__icontains=search_query) | Q(description__icontains=search_query)
-        )
+        tickets = search_tickets(tickets, search_query)
     
-    paginator = Paginator(tickets, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    def ticket_table():
+        page_obj = paginate(request, tickets, "employee_dashboard", 10, TICKET_CURSOR_ORDERING)
+        return render_to_string("support/fragments/employee_ticket_table.html", {
+            "tickets": page_obj,
+            "search_query": search_query,
+        }, request)
+
+    def asset_cards():
+        return render_to_string(
+            "support/fragments/employee_assets.html", {"assets": assets}, request
+        )
     
     context = {
-        "tickets": page_obj,
+        "ticket_table": cached(
+            "employee_ticket_table", [TICKETS], user_key + [request.GET.urlencode()], ticket_table
+        ),
+        "asset_cards": cached("employee_assets", [ASSETS], user_key, asset_cards),
         "recent_tickets": recent_tickets,
-        "assets": assets,
         "stats": stats,
         "search_query": search_query,
     }
@@ -99,21 +189,24 @@ def raise_ticket(request):
             return redirect("employee_dashboard")
     else:
         form = TicketForm()
-    return render(request, "support/raise_ticket.html", {"form": form})
+    return render(request, "support/raise_ticket.html", {
+        "form": form,
+        "max_attachment_size": max_attachment_size(),
+    })
 
 
 @login_required
 def ticket_detail(request, pk):
     """Ticket detail view with comments."""
-    ticket = get_object_or_404(Ticket, pk=pk)
+    ticket = get_object_or_404(
+        Ticket.objects.select_related("employee", "assigned_to"), pk=pk
+    )
     
     # Security: employees can only view their own tickets
-    if not is_it_admin(request.user) and ticket.employee != request.user:
+    if not is_it_admin(request.user) and ticket.employee_id != request.user.pk:
         messages.error(request, "You don't have permission to view this ticket.")
         return redirect("employee_dashboard")
     
-    comments = ticket.comments.all()
-    
     if request.method == "POST":
         comment_form = TicketCommentForm(request.POST)
         if comment_form.is_valid():
@@ -128,14 +221,31 @@ def ticket_detail(request, pk):
     
     context = {
         "ticket": ticket,
-        "comments": comments,
         "comment_form": comment_form,
+        **comment_thread(request, ticket),
     }
     return render(request, "support/ticket_detail.html", context)
 
 
+@login_required
+def ticket_attachment(request, pk, variant):
+    """Download a ticket's screenshot, or its preview or thumbnail."""
+    if variant not in ATTACHMENT_VARIANTS:
+        raise Http404("Unknown attachment variant")
+    ticket = get_object_or_404(
+        Ticket.objects.only("employee_id", *ATTACHMENT_VARIANTS.values()), pk=pk
+    )
+    if not is_it_admin(request.user) and ticket.employee_id != request.user.pk:
+        return HttpResponseForbidden("You don't have permission to view this attachment.")
+    file = getattr(ticket, ATTACHMENT_VARIANTS[variant])
+    if not file:
+        raise Http404("Attachment not found")
+    return attachment_response(request, file)
+
+
 @login_required
 @user_passes_test(is_it_admin)
+@reads_from_replica
 def admin_dashboard(request):
     """IT admin dashboard with ticket filters and statistics."""
     status_filter = request.GET.get("status") or ""
@@ -143,51 +253,29 @@ def admin_dashboard(request):
     urgency_filter = request.GET.get("urgency") or ""
     search_query = request.GET.get("search") or ""
 
-    tickets = Ticket.objects.select_related("employee", "assigned_to").all()
-    
-    if status_filter:
-        tickets = tickets.filter(status=status_filter)
-    if category_filter:
-        tickets = tickets.filter(category=category_filter)
-    if urgency_filter:
-        tickets = tickets.filter(urgency=urgency_filter)
-    if search_query:
-        tickets = tickets.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(employee__username__icontains=search_query)
-        )
+    tickets = admin_ticket_queryset(request.GET)
 
-    # Statistics
-    all_tickets = Ticket.objects.all()
-    stats = {
-        "total": all_tickets.count(),
-        "open": all_tickets.filter(status="open").count(),
-        "in_progress": all_tickets.filter(status="in_progress").count(),
-        "resolved": all_tickets.filter(status="resolved").count(),
-        "closed": all_tickets.filter(status="closed").count(),
-        "high_urgency": all_tickets.filter(urgency="high", status__in=["open", "in_progress"]).count(),
-        "unassigned": all_tickets.filter(assigned_to__isnull=True, status__in=["open", "in_progress"]).count(),
-    }
-    
-    # Category breakdown
-    category_stats = (
-        all_tickets.values("category")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-    
-    # Recent activity (last 7 days)
-    week_ago = datetime.now() - timedelta(days=7)
-    recent_tickets = all_tickets.filter(created_at__gte=week_ago).count()
+    # Statistics, category breakdown and recent activity in one query
+    stats = cached("admin_stats", [TICKETS], [], ticket_stats)
+    category_stats = category_breakdown(stats)
+    recent_tickets = stats["recent"]
 
     # Pagination
-    paginator = Paginator(tickets, 15)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    def ticket_table():
+        page_obj = paginate(request, tickets, "admin_dashboard", 15, TICKET_CURSOR_ORDERING)
+        return render_to_string("support/fragments/admin_ticket_table.html", {
+            "tickets": page_obj,
+            "status_filter": status_filter,
+            "category_filter": category_filter,
+            "urgency_filter": urgency_filter,
+            "search_query": search_query,
+        }, request)
 
     context = {
-        "tickets": page_obj,
+        "ticket_table": cached(
+            "admin_ticket_table", [TICKETS],
+            [request.user.pk, request.GET.urlencode()], ticket_table,
+        ),
         "status_filter": status_filter,
         "category_filter": category_filter,
         "urgency_filter": urgency_filter,
@@ -198,6 +286,7 @@ def admin_dashboard(request):
         "stats": stats,
         "category_stats": category_stats,
         "recent_tickets": recent_tickets,
+        "export_query": export_querystring(request.GET),
     }
     return render(request, "support/admin_dashboard.html", context)
 
@@ -206,9 +295,14 @@ def admin_dashboard(request):
 @user_passes_test(is_it_admin)
 def admin_ticket_edit(request, pk):
     """Admin ticket management page."""
-    ticket = get_object_or_404(Ticket, pk=pk)
+    ticket = get_object_or_404(
+        Ticket.objects.select_related("employee", "assigned_to"), pk=pk
+    )
     old_status = ticket.status
-    old_assigned = ticket.assigned_to
+    old_assigned_id = ticket.assigned_to_id
+    old_urgency = ticket.urgency
+    form = TicketUpdateForm(instance=ticket)
+    comment_form = TicketCommentForm()
     
     if request.method == "POST":
         # Handle comment submission separately
@@ -224,31 +318,15 @@ def admin_ticket_edit(request, pk):
         else:
             form = TicketUpdateForm(request.POST, instance=ticket)
             if form.is_valid():
-                ticket = form.save()
-                # Add comment if status changed
-                if old_status != ticket.status:
-                    status_map = dict(Ticket.STATUS_CHOICES)
-                    TicketComment.objects.create(
-                        ticket=ticket,
-                        user=request.user,
-                        comment=f"Status changed from {status_map.get(old_status, old_status)} to {ticket.get_status_display()}",
-                    )
-                # Add comment if assignment changed
-                if old_assigned != ticket.assigned_to:
-                    old_name = old_assigned.get_full_name() if old_assigned else "Unassigned"
-                    new_name = ticket.assigned_to.get_full_name() if ticket.assigned_to else "Unassigned"
-                    TicketComment.objects.create(
-                        ticket=ticket,
-                        user=request.user,
-                        comment=f"Ticket reassigned from {old_name} to {new_name}",
+                # The events and the task handling their side effects commit
+                # together with the update.
+                with transaction.atomic():
+                    ticket = form.save()
+                    record_ticket_changes(
+                        ticket, request.user, timezone.now(), old_status, old_assigned_id, old_urgency
                     )
                 messages.success(request, "Ticket updated successfully!")
                 return redirect("admin_dashboard")
-    else:
-        form = TicketUpdateForm(instance=ticket)
-        comment_form = TicketCommentForm()
-    
-    comments = ticket.comments.all()
     
     return render(
         request,
@@ -256,55 +334,78 @@ def admin_ticket_edit(request, pk):
         {
             "ticket": ticket,
             "form": form,
-            "comments": comments,
             "comment_form": comment_form,
+            **comment_thread(request, ticket),
         },
     )
 
 
 @login_required
 @user_passes_test(is_it_admin)
+@reads_from_replica
 def asset_list(request):
     """List all assets for IT admin."""
     status_filter = request.GET.get("status") or ""
     search_query = request.GET.get("search") or ""
     
-    assets = Asset.objects.select_related("assigned_to").all()
-    
-    if status_filter:
-        assets = assets.filter(status=status_filter)
-    if search_query:
-        assets = assets.filter(
-            Q(device_type__icontains=search_query) |
-            Q(brand__icontains=search_query) |
-            Q(serial_number__icontains=search_query)
-        )
+    today = timezone.localdate()
+    assets = with_warranty(asset_queryset(request.GET), today)
     
-    # Statistics
-    stats = {
-        "total": assets.count(),
-        "in_use": Asset.objects.filter(status="in_use").count(),
-        "available": Asset.objects.filter(status="available").count(),
-        "under_repair": Asset.objects.filter(status="under_repair").count(),
-        "warranty_expiring_soon": Asset.objects.filter(
-            warranty_expiry__lte=datetime.now().date() + timedelta(days=30),
-            warranty_expiry__gte=datetime.now().date()
-        ).count(),
-    }
+    # Statistics: the filtered total, then every fleet count in one query
+    def asset_stats():
+        return {"total": assets.count(), **Asset.objects.aggregate(**asset_aggregates(today))}
+    stats = cached("asset_stats", [ASSETS], [today, status_filter, search_query], asset_stats)
     
     # Pagination
-    paginator = Paginator(assets, 15)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    def asset_table():
+        page_obj = paginate(request, assets, "asset_list", 15, ASSET_CURSOR_ORDERING)
+        return render_to_string("support/fragments/asset_table.html", {
+            "assets": page_obj,
+            "status_filter": status_filter,
+            "search_query": search_query,
+        }, request)
     
     return render(request, "support/asset_list.html", {
-        "assets": page_obj,
+        "asset_table": cached(
+            "asset_table", [ASSETS], [request.user.pk, today, request.GET.urlencode()], asset_table
+        ),
         "stats": stats,
         "status_filter": status_filter,
         "search_query": search_query,
     })
 
 
+@login_required
+@user_passes_test(is_it_admin)
+@reads_from_replica
+def sla_breach_list(request):
+    """Tickets past their response or resolution deadline."""
+    kind = request.GET.get("kind") if request.GET.get("kind") in BREACH_KINDS else ""
+    now = timezone.now()
+    tickets = sla_breaches(kind or None, now).select_related("employee", "assigned_to")
+    page_obj = paginate(request, tickets, "sla_breaches", 25, breach_ordering(kind or None))
+    return render(request, "support/sla_breaches.html", {
+        "tickets": page_obj,
+        "kind": kind,
+        "kinds": BREACH_KINDS,
+        "now": now,
+    })
+
+
+@login_required
+@user_passes_test(is_it_admin)
+@reads_from_replica
+def ticket_trend_data(request):
+    """Opened, resolved and backlog series from the daily rollups, for the dashboard charts."""
+    bucket = request.GET.get("bucket") if request.GET.get("bucket") in BUCKETS else "day"
+    category = request.GET.get("category") if request.GET.get("category") in CATEGORIES else None
+    try:
+        days = min(max(int(request.GET.get("days", 365)), 1), MAX_DAYS)
+    except ValueError:
+        days = 365
+    return JsonResponse(ticket_trends(bucket, days, category))
+
+
 @login_required
 @user_passes_test(is_it_admin)
 def asset_add(request):
@@ -312,7 +413,9 @@ def asset_add(request):
     if request.method == "POST":
         form = AssetForm(request.POST)
         if form.is_valid():
-            form.save()
+            form.instance._changed_by = request.user
+            with transaction.atomic():
+                form.save()
             messages.success(request, "Asset added successfully!")
             return redirect("asset_list")
     else:
@@ -324,19 +427,98 @@ def asset_add(request):
 @user_passes_test(is_it_admin)
 def asset_edit(request, pk):
     """Assign / update an asset."""
-    asset = get_object_or_404(Asset, pk=pk)
+    asset = get_object_or_404(with_warranty(Asset.objects.all()), pk=pk)
     if request.method == "POST":
         form = AssetAssignForm(request.POST, instance=asset)
         if form.is_valid():
-            form.save()
+            asset._changed_by = request.user
+            # The asset and its new history interval are saved together.
+            with transaction.atomic():
+                form.save()
             messages.success(request, "Asset updated successfully!")
             return redirect("asset_list")
     else:
         form = AssetAssignForm(instance=asset)
+    history = asset.history.select_related("assigned_to", "changed_by").order_by("-valid_from")
     return render(
         request,
         "support/asset_edit.html",
-        {"asset": asset, "form": form},
+        {"asset": asset, "form": form, "history": history[:ASSET_HISTORY_SHOWN]},
+    )
+
+
+@login_required
+@user_passes_test(is_it_admin)
+@reads_from_replica
+def asset_inventory(request):
+    """The fleet by device type and status, and an asset's holder, as they were on a given day."""
+    form = InventoryForm(request.GET or None)
+    filters = form.cleaned_data if form.is_valid() else {}
+    day = filters.get("day") or timezone.localdate()
+    at = end_of_day(day)
+    device_type = filters.get("device_type") or None
+    serial_number = filters.get("serial_number")
+    rows = inventory_table(inventory_counts(at, device_type))
+    return render(request, "support/asset_inventory.html", {
+        "form": form,
+        "day": day,
+        "statuses": Asset.STATUS_CHOICES,
+        "rows": rows,
+        "total": sum(row["total"] for row in rows),
+        "serial_number": serial_number,
+        "holder": holder_at(serial_number, at) if serial_number else None,
+    })
+
+
+@login_required
+@user_passes_test(is_it_admin)
+def import_upload(request):
+    """Bulk import assets or tickets from an uploaded file."""
+    context = {}
+    if request.method == "POST":
+        form = ImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            dry_run = form.cleaned_data["dry_run"]
+            importer = IMPORTERS[form.cleaned_data["kind"]](dry_run=dry_run)
+            try:
+                report = importer.run(read_rows(text_handle(upload), guess_format(upload.name)))
+            except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+                form.add_error("file", f"Could not read file: {exc}")
+            else:
+                context.update({
+                    "report": report,
+                    "errors": report.errors[:IMPORT_ERRORS_SHOWN],
+                    "dry_run": dry_run,
+                    "valid_rows": report.rows - report.failed,
+                })
+                if not dry_run and report.created:
+                    messages.success(request, f"Imported {report.created} rows.")
+    else:
+        form = ImportUploadForm()
+    context["form"] = form
+    return render(request, "support/import_upload.html", context)
+
+
+@login_required
+@user_passes_test(is_it_admin)
+def metrics_dashboard(request):
+    """Rolling per-view timings and cache hit rates for this process."""
+    return render(request, "support/metrics.html", {
+        "views": view_metrics(),
+        "cache_entries": sorted(cache_stats().items()),
+        "sample_rate": sample_rate(),
+    })
+
+
+def metrics_endpoint(request):
+    """Prometheus scrape target: a bearer METRICS_TOKEN or an IT admin session."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not (token and constant_time_compare(supplied, token)) and not is_it_admin(request.user):
+        return HttpResponseForbidden("Forbidden")
+    return HttpResponse(
+        REGISTRY.exposition(), content_type="text/plain; version=0.0.4; charset=utf-8"
     )
 
 
@@ -358,38 +540,36 @@ def user_profile(request):
 @login_required
 @user_passes_test(is_it_admin)
 def export_tickets_csv(request):
-    """Export tickets to CSV."""
-    response = HttpResponse(content_type="text/csv")
+    """Export tickets matching the dashboard filters to CSV."""
+    if request.GET.get("background"):
+        name = start_background_export(request.GET)
+        messages.info(request, "Your export is being generated.")
+        return redirect("export_download", name=name)
+
+    response = StreamingHttpResponse(
+        stream_ticket_csv(request.GET), content_type="text/csv"
+    )
     response["Content-Disposition"] = 'attachment; filename="tickets_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        "ID", "Title", "Customer Name", "Customer Email", "Customer Phone", "Customer Alternate Phone",
-        "Employee", "Category", "Urgency", "Status",
-        "Assigned To", "Created At", "Description"
-    ])
-    
-    tickets = Ticket.objects.select_related("employee", "assigned_to").all()
-    for ticket in tickets:
-        writer.writerow([
-            ticket.id,
-            ticket.title,
-            ticket.customer_name or "",
-            ticket.customer_email or "",
-            ticket.customer_phone or "",
-            ticket.customer_alternate_phone or "",
-            ticket.employee.username,
-            ticket.get_category_display(),
-            ticket.get_urgency_display(),
-            ticket.get_status_display(),
-            ticket.assigned_to.username if ticket.assigned_to else "Unassigned",
-            ticket.created_at.strftime("%Y-%m-%d %H:%M"),
-            ticket.description[:100],  # Truncate long descriptions
-        ])
-    
     return response
 
 
+@login_required
+@user_passes_test(is_it_admin)
+def export_download(request, name):
+    """Download a background export, or show its progress."""
+    status = export_status(name)
+    if status == "missing":
+        raise Http404("Export not found")
+    if status in ("pending", "failed"):
+        return render(
+            request, "support/export_status.html", {"name": name, "failed": status == "failed"},
+            status=500 if status == "failed" else 200,
+        )
+    return FileResponse(
+        open(export_path(name), "rb"), as_attachment=True, filename=name
+    )
+
+
 def home(request):
     if not request.user.is_authenticated:
         return redirect("login")
@@ -0,0 +1,107 @@
+"""
+Asset warranty status and the expiry report.
+
+``with_warranty`` annotates each asset with its days of warranty left and
+a state (``expired``, ``expiring`` or ``valid``) computed by the database
+against one ``today``, so templates do not call ``timezone.now()`` per row.
+Expiry windows are range conditions on the indexed ``warranty_expiry``.
+
+``manage.py warranty_report`` reads the matching assets in chunks, ordered
+by assignee and device type, and writes them as CSV rows while it reads,
+so memory stays flat for any fleet size. The email variant sends
+per-group totals, which one grouped query returns.
+"""
+import csv
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import Case, Count, DateField, F, Min, Q, Value, When
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Asset
+
+CHUNK_SIZE = 2000
+REPORT_HEADER = [
+    "assignee", "assignee_email", "device_type", "brand", "serial_number",
+    "status", "warranty_expiry", "days_left", "warranty_state",
+]
+
+
+def expiring_days(days=None) -> int:
+    return getattr(settings, "WARRANTY_EXPIRING_DAYS", 30) if days is None else days
+
+
+def expiring_soon(today, days=None) -> Q:
+    return Q(warranty_expiry__gte=today, warranty_expiry__lte=today + timedelta(days=expiring_days(days)))
+
+
+def with_warranty(assets, today=None, days=None):
+    """Annotate ``warranty_left`` (a timedelta) and ``warranty_state``."""
+    today = today or timezone.localdate()
+    return assets.annotate(
+        warranty_left=F("warranty_expiry") - Value(today, output_field=DateField()),
+        warranty_state=Case(
+            When(warranty_expiry__lt=today, then=Value("expired")),
+            When(expiring_soon(today, days), then=Value("expiring")),
+            default=Value("valid"),
+        ),
+    )
+
+
+def warranty_aggregates(today) -> dict:
+    """Counts to merge into an ``Asset`` aggregate for the asset list stats."""
+    return {
+        "warranty_expiring_soon": Count("id", filter=expiring_soon(today)),
+        "warranty_expired": Count("id", filter=Q(warranty_expiry__lt=today)),
+    }
+
+
+def report_assets(days=None, include_expired=True, today=None):
+    """Assets expiring within ``days``, and those already expired, by assignee and device type."""
+    today = today or timezone.localdate()
+    until = today + timedelta(days=expiring_days(days))
+    assets = Asset.objects.filter(warranty_expiry__lte=until)
+    if not include_expired:
+        assets = assets.filter(warranty_expiry__gte=today)
+    return with_warranty(assets, today, days).order_by(
+        F("assigned_to__username").asc(nulls_last=True), "device_type", "warranty_expiry", "id"
+    )
+
+
+def write_warranty_csv(handle, assets) -> int:
+    """Write ``assets`` (from ``report_assets``) to ``handle``; returns the rows written."""
+    writer = csv.writer(handle)
+    writer.writerow(REPORT_HEADER)
+    rows = assets.values_list(
+        "assigned_to__username", "assigned_to__email", "device_type", "brand", "serial_number",
+        "status", "warranty_expiry", "warranty_left", "warranty_state",
+    )
+    written = 0
+    for username, email, *fields, left, state in rows.iterator(chunk_size=CHUNK_SIZE):
+        writer.writerow([username or "", email or "", *fields, left.days, state])
+        written += 1
+    return written
+
+
+def warranty_groups(assets) -> list:
+    """Asset counts and earliest expiry per (assignee, device type, state)."""
+    return list(
+        assets.values("assigned_to__username", "device_type", "warranty_state")
+        .annotate(count=Count("id"), first_expiry=Min("warranty_expiry"))
+        .order_by(F("assigned_to__username").asc(nulls_last=True), "device_type", "warranty_state")
+    )
+
+
+def warranty_email(recipients, assets, days=None, today=None) -> EmailMessage:
+    today = today or timezone.localdate()
+    groups = warranty_groups(assets)
+    body = render_to_string("support/email/warranty_report.txt", {
+        "groups": groups,
+        "total": sum(group["count"] for group in groups),
+        "days": expiring_days(days),
+        "today": today,
+    })
+    subject = f"[Helpdesk] Warranty report for {today:%Y-%m-%d}"
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, list(recipients))
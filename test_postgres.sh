@@ -0,0 +1,22 @@
+#!/usr/bin/env bash
+# Run the test suite against a throwaway local PostgreSQL cluster.
+# Needs initdb/pg_ctl on PATH and psycopg installed; skips otherwise.
+set -o errexit
+
+if ! command -v initdb >/dev/null || ! command -v pg_ctl >/dev/null; then
+    echo "Skipping PostgreSQL tests: initdb/pg_ctl not found."
+    exit 0
+fi
+if ! python -c "import psycopg" 2>/dev/null; then
+    echo "Skipping PostgreSQL tests: psycopg is not installed."
+    exit 0
+fi
+
+DATA_DIR="$(mktemp -d)"
+PORT="${PGTEST_PORT:-55432}"
+trap 'pg_ctl -D "$DATA_DIR" -m immediate stop >/dev/null 2>&1 || true; rm -rf "$DATA_DIR"' EXIT
+
+initdb -D "$DATA_DIR" -U postgres --auth=trust >/dev/null
+pg_ctl -D "$DATA_DIR" -o "-p $PORT -k $DATA_DIR -c listen_addresses=localhost" -w start >/dev/null
+
+DATABASE_URL="postgres://postgres@localhost:$PORT/postgres" python manage.py test "$@"